@@ -0,0 +1,82 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .isolation import run_isolated, RunStatus
+from .utils import lazy_import
+from .verify import passed, read_expected, to_record, verify_answers
+
+tabulate = lazy_import('tabulate')
+
+
+def parse_day_range(spec):
+    # "05" -> (5, 5), "01-10" -> (1, 10), None -> the whole year
+    if not spec:
+        return 1, 25
+    first, _, last = spec.partition('-')
+    return int(first), int(last or first)
+
+
+def find_days(year, first=1, last=25, solution_file='solution'):
+    year_dir = os.path.join(os.getcwd(), year)
+    if not os.path.isdir(year_dir):
+        return []
+    return sorted(
+        (name for name in os.listdir(year_dir)
+         if name.isdigit() and first <= int(name) <= last
+         and os.path.exists(os.path.join(year_dir, name, f'{solution_file}.py'))),
+        key=int
+    )
+
+
+def run_batch(year, days, solution_file='solution', input_file='input.txt', jobs=None,
+              timeout=None, verify=False, fail_fast=False):
+    # each day runs in its own child process, the threads only wait on them
+    # so a crash or runaway solution never takes the rest of the batch down
+    expected = {day: read_expected(year, day) if verify else (None, None) for day in days}
+    jobs = jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(run_isolated, year, day,
+                            os.path.join(os.getcwd(), year, day, input_file),
+                            solution_file=solution_file, timeout=timeout,
+                            expected_part1=expected[day][0] if fail_fast else None)
+            for day in days
+        ]
+        results = [(day, future.result()) for day, future in zip(days, futures)]
+    if not verify:
+        return [(day, result, None) for day, result in results]
+    return [(day, result, verify_answers(result.answers, expected[day], fail_fast=fail_fast))
+            for day, result in results]
+
+
+def format_summary(results, sort='day'):
+    # results are (day, RunResult, verdicts or None) as returned by run_batch
+    if sort == 'time':
+        results = sorted(results, key=lambda item: item[1].elapsed, reverse=True)
+    verified = any(verdicts is not None for _, _, verdicts in results)
+    rows = []
+    for day, result, verdicts in results:
+        row = [day, result.part1, result.part2, f'{result.elapsed:.3f}s',
+               result.status.name.lower().replace('_', ' ')]
+        if verified:
+            row.extend(verdict.value for verdict in verdicts)
+        rows.append(row)
+    headers = ['Day', 'Part 1', 'Part 2', 'Time', 'Status']
+    if verified:
+        headers.extend(['Check 1', 'Check 2'])
+    return tabulate.tabulate(rows, stralign='right', missingval='-', headers=headers)
+
+
+def count_failures(results):
+    return sum(1 for _, result, verdicts in results
+               if result.status != RunStatus.OK
+               or (verdicts is not None and not passed(verdicts)))
+
+
+def to_records(year, results):
+    return [
+        to_record(year, day, result.answers, read_expected(year, day), verdicts,
+                  status=result.status.name.lower(), elapsed=result.elapsed)
+        for day, result, verdicts in results if verdicts is not None
+    ]
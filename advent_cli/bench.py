@@ -0,0 +1,153 @@
+import json
+import statistics
+import tracemalloc
+
+from time import perf_counter_ns
+
+from .utils import (
+    data_sharing,
+    input_mode,
+    lazy_import,
+    load_input,
+    load_solution,
+    read_input,
+    share_data
+)
+
+tabulate = lazy_import('tabulate')
+
+STAGES = ('parse', 'part1', 'part2')
+
+
+def run_stages(solution, make_input):
+    # one full run, returns the answers and the time taken by each stage in ns
+    raw_input = make_input()
+    start = perf_counter_ns()
+    data = solution.parse_input(raw_input)
+    parse_ns = perf_counter_ns() - start
+
+    data1, data2 = share_data(solution, data, make_input)
+
+    start = perf_counter_ns()
+    part1_answer = solution.part1(*data1)
+    part1_ns = perf_counter_ns() - start
+
+    start = perf_counter_ns()
+    part2_answer = solution.part2(*data2)
+    part2_ns = perf_counter_ns() - start
+
+    return (part1_answer, part2_answer), (parse_ns, part1_ns, part2_ns)
+
+
+def measure_peak_memory(solution, make_input):
+    # separate run, tracemalloc slows everything down too much to time with it on
+    peaks = []
+
+    raw_input = make_input()
+    tracemalloc.start()
+    data = solution.parse_input(raw_input)
+    peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    data1, data2 = share_data(solution, data, make_input)
+    for part, args in ((solution.part1, data1), (solution.part2, data2)):
+        tracemalloc.start()
+        part(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return peaks
+
+
+def measure_fan_out(solution, make_input):
+    # what giving each part its own data costs on top of parsing once, returns the policy,
+    # the memory it allocated and the time it took in ns (timed without tracemalloc)
+    data = solution.parse_input(make_input())
+    start = perf_counter_ns()
+    share_data(solution, data, make_input)
+    elapsed = perf_counter_ns() - start
+
+    data = solution.parse_input(make_input())
+    tracemalloc.start()
+    share_data(solution, data, make_input)
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'policy': data_sharing(solution, data), 'peak_memory': size, 'time': elapsed}
+
+
+def summarize(samples):
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def benchmark(year, day, file_path, solution_file='solution', runs=5, warmup=1):
+    solution = load_solution(year, day, solution_file)
+    if input_mode(solution) == 'lines':
+        # read once, each run gets its own copy of the list
+        lines = read_input(file_path)
+
+        def make_input():
+            return list(lines)
+    else:
+        # streams and mappings can't be reused, load them again for every run
+        def make_input():
+            return load_input(solution, file_path)
+
+    for _ in range(warmup):
+        run_stages(solution, make_input)
+
+    samples = [[] for _ in STAGES]
+    answers = (None, None)
+    for _ in range(max(runs, 1)):
+        answers, times = run_stages(solution, make_input)
+        for stage_samples, ns in zip(samples, times):
+            stage_samples.append(ns)
+
+    peaks = measure_peak_memory(solution, make_input)
+    fan_out = measure_fan_out(solution, make_input)
+
+    return {
+        'year': year,
+        'day': day,
+        'solution': solution_file,
+        'input': file_path,
+        'runs': max(runs, 1),
+        'warmup': warmup,
+        'answers': {'part1': answers[0], 'part2': answers[1]},
+        'stages': {
+            stage: {**summarize(stage_samples), 'peak_memory': peak}
+            for stage, stage_samples, peak in zip(STAGES, samples, peaks)
+        },
+        'fan_out': fan_out,
+    }
+
+
+def format_ns(ns):
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+        if ns >= scale:
+            return f'{ns / scale:.2f} {unit}'
+    return f'{ns:.0f} ns'
+
+
+def format_bytes(size):
+    for unit, scale in (('MiB', 1024 ** 2), ('KiB', 1024)):
+        if size >= scale:
+            return f'{size / scale:.1f} {unit}'
+    return f'{size} B'
+
+
+def format_table(result):
+    rows = [
+        [stage, format_ns(stats['min']), format_ns(stats['median']),
+         format_ns(stats['stdev']), format_bytes(stats['peak_memory'])]
+        for stage, stats in result['stages'].items()
+    ]
+    return tabulate.tabulate(rows, stralign='right',
+                             headers=['Stage', 'Min', 'Median', 'Stdev', 'Peak memory'])
+
+
+def format_json(result):
+    return json.dumps(result, indent=2, default=str)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import math
+import os
+import re
+import time
+
+from .utils import lazy_import
+
+requests = lazy_import('requests')
+
+# seconds a cached response stays fresh, first matching pattern wins
+# inputs never change, private leaderboards should not be polled more than every 15 minutes
+TTL_RULES = [
+    (re.compile(r'/\d{4}/day/\d+/input$'), math.inf),
+    (re.compile(r'/\d{4}/day/\d+$'), 300),
+    (re.compile(r'/\d{4}/leaderboard/self$'), 300),
+    (re.compile(r'/\d{4}/leaderboard/private/view/\d+(\.json)?$'), 900),
+    (re.compile(r'/\d{4}/leaderboard/private$'), 3600),
+]
+
+
+def get_ttl(url):
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return 0
+
+
+class ResponseCache:
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    def key(self, url, session_cookie):
+        # keyed on session identity too, inputs and boards differ between accounts
+        identity = hashlib.sha256(session_cookie.encode()).hexdigest()
+        return hashlib.sha256(f'{identity}:{url}'.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def load(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # mark as recently used for eviction, freshness goes by the stored time
+            os.utime(self._path(key))
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry, ttl):
+        return time.time() - entry['time'] < ttl
+
+    def store(self, key, response):
+        entry = {
+            'url': response.url,
+            'time': time.time(),
+            'status': response.status_code,
+            'headers': {
+                name: response.headers[name]
+                for name in ('Content-Type', 'ETag', 'Last-Modified')
+                if name in response.headers
+            },
+            'body': response.text,
+        }
+        self._write(key, entry)
+        self.evict()
+
+    def revalidated(self, key, entry):
+        entry['time'] = time.time()
+        self._write(key, entry)
+
+    def invalidate(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _write(self, key, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{self._path(key)}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+
+    def evict(self):
+        evict_lru(self.directory, self.max_size, '.json')
+
+
+def evict_lru(directory, max_size, suffix):
+    # drop the entries with the oldest mtime until the directory fits in max_size,
+    # caches that bump the mtime on every hit get least recently used eviction
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(suffix)]
+    except OSError:
+        return
+    stats = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+    total = sum(size for _, size, _ in stats)
+    for _, size, path in stats:
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def conditional_headers(entry):
+    headers = {}
+    if 'ETag' in entry['headers']:
+        headers['If-None-Match'] = entry['headers']['ETag']
+    if 'Last-Modified' in entry['headers']:
+        headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+    return headers
+
+
+def to_response(entry):
+    r = requests.Response()
+    r.status_code = entry['status']
+    r.url = entry['url']
+    r.headers.update(entry['headers'])
+    r.encoding = 'utf-8'
+    r._content = entry['body'].encode('utf-8')
+    return r
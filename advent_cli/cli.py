@@ -1,12 +1,96 @@
 import argparse
+import sys
 from datetime import datetime as dt
 
-from . import commands
+from . import commands, config, results
 from ._version import __version__
-from .utils import CustomHelpFormatter
+from .utils import CustomHelpFormatter, lazy_import
 
 from termcolor import colored
 
+client = lazy_import('advent_cli.client')
+server = lazy_import('advent_cli.server')
+
+
+def add_cache_arguments(parser):
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        action='store_true',
+        help='do not read or write the local response cache'
+    )
+    parser.add_argument(
+        '--refresh',
+        dest='refresh',
+        action='store_true',
+        help='ignore cached responses and fetch them again'
+    )
+
+
+# test flags that only apply to a single day, a whole year or range of days runs every
+# day in a plain subprocess without them
+SINGLE_DAY_FLAGS = {
+    'parallel': '--parallel',
+    'isolate': '--isolate',
+    'cpu_limit': '--cpu-limit',
+    'memory_limit': '--memory-limit',
+    'bench': '--bench',
+    'profiler': '--profile',
+    'no_cache': '--no-cache',
+    'watch': '--watch',
+}
+
+
+def add_result_cache_arguments(parser):
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        action='store_true',
+        help="run the solution even if it's unchanged since its answers were cached"
+    )
+
+
+def add_daemon_arguments(parser):
+    parser.add_argument(
+        '--no-daemon',
+        dest='no_daemon',
+        action='store_true',
+        help='run here even if "advent daemon" is running'
+    )
+
+
+def megabytes(value):
+    return value * 1024 * 1024 if value is not None else None
+
+
+def add_execution_arguments(parser):
+    parser.add_argument(
+        '--isolate',
+        dest='isolate',
+        action='store_true',
+        help='run the solution in a child process with the limits below'
+    )
+    parser.add_argument(
+        '--timeout',
+        dest='timeout',
+        type=float,
+        help='give up after this many seconds\n'
+             '(whole run with --isolate, each part with --parallel)'
+    )
+    parser.add_argument(
+        '--cpu-limit',
+        dest='cpu_limit',
+        type=float,
+        help='CPU time limit in seconds (with --isolate)'
+    )
+    parser.add_argument(
+        '--memory-limit',
+        dest='memory_limit',
+        type=int,
+        help='address space limit in MB (with --isolate)'
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(formatter_class=CustomHelpFormatter)
     parser.add_argument(
@@ -32,10 +116,27 @@ def main():
         help='the year and day in YYYY/DD format (e.g. "2021/01") or year to get all puzzles from that year'
     )
 
+    puzzle_parser.add_argument(
+        '-j', '--jobs',
+        dest='jobs',
+        type=int,
+        default=1,
+        help='number of days to download concurrently when getting a whole year'
+    )
+    puzzle_parser.add_argument(
+        '--rate',
+        dest='rate',
+        type=float,
+        default=config.DEFAULT_RATE_LIMIT,
+        help=f'maximum requests per second (default: {config.DEFAULT_RATE_LIMIT})'
+    )
+
     solution_parser.add_argument(
         'date',
         help='the year and day in YYYY/DD format (e.g. "2021/01") or "year" to get all solutions from that year'
     )
+    add_cache_arguments(puzzle_parser)
+    add_cache_arguments(solution_parser)
 
     parser_stats = command_subparsers.add_parser(
         'stats',
@@ -54,6 +155,7 @@ def main():
         action='store_true',
         help='show private leaderboard(s)'
     )
+    add_cache_arguments(parser_stats)
     parser_test = command_subparsers.add_parser(
         'test',
         help='run solution and output answers without submitting',
@@ -61,7 +163,8 @@ def main():
     )
     parser_test.add_argument(
         'date',
-        help='the year and day in YYYY/DD format (e.g. "2021/01")'
+        help='the year and day in YYYY/DD format (e.g. "2021/01"), a year to test\n'
+             'every day of it (e.g. "2021") or a range of days (e.g. "2021/01-10")'
     )
     parser_test.add_argument(
         '-i', '--input',
@@ -77,6 +180,215 @@ def main():
         help='solution file to run instead of solution.py\n'
              '(e.g. "solution2" for solution2.py)'
     )
+    parser_test.add_argument(
+        '--parallel',
+        dest='parallel',
+        action='store_true',
+        help='run part1 and part2 at the same time in separate processes'
+    )
+    add_execution_arguments(parser_test)
+    add_result_cache_arguments(parser_test)
+    add_daemon_arguments(parser_test)
+    parser_test.add_argument(
+        '-j', '--jobs',
+        dest='jobs',
+        type=int,
+        help='number of days to run at once when testing a whole year\n'
+             '(default: number of CPU cores)'
+    )
+    parser_test.add_argument(
+        '--sort',
+        dest='sort',
+        choices=['day', 'time'],
+        default='day',
+        help='order of the summary when testing a whole year (default: day)'
+    )
+    parser_test.add_argument(
+        '-w', '--watch',
+        dest='watch',
+        action='store_true',
+        help='keep running the solution whenever it, a module it imports\n'
+             'or the input file changes'
+    )
+    parser_test.add_argument(
+        '--verify',
+        dest='verify',
+        action='store_true',
+        help='compare answers to the accepted ones in solution1.txt/solution2.txt'
+    )
+    parser_test.add_argument(
+        '--fail-fast',
+        dest='fail_fast',
+        action='store_true',
+        help="don't run part 2 if part 1 doesn't match (with --verify)"
+    )
+    parser_test.add_argument(
+        '--bench',
+        dest='bench',
+        action='store_true',
+        help='time parse_input, part1 and part2 separately over several runs'
+    )
+    parser_test.add_argument(
+        '-n', '--runs',
+        dest='runs',
+        type=int,
+        default=5,
+        help='number of timed runs with --bench (default: 5)'
+    )
+    parser_test.add_argument(
+        '--warmup',
+        dest='warmup',
+        type=int,
+        default=1,
+        help='number of untimed runs before timing with --bench (default: 1)'
+    )
+    parser_test.add_argument(
+        '--profile',
+        dest='profiler',
+        nargs='?',
+        const='cprofile',
+        choices=('cprofile', 'sampling'),
+        help='profile parse_input, part1 and part2 separately and write\n'
+             '.prof (cprofile) or collapsed stack (sampling) files\n'
+             'next to the solution (default: cprofile)'
+    )
+    parser_test.add_argument(
+        '--top',
+        dest='top',
+        type=int,
+        default=15,
+        help='number of hot functions to show with --profile (default: 15)'
+    )
+    parser_test.add_argument(
+        '--json',
+        dest='json_file',
+        help='also write --bench or --verify results as JSON to this file'
+    )
+    parser_bench = command_subparsers.add_parser(
+        'bench',
+        help='time a solution, or how its run time grows with the input size',
+        formatter_class=CustomHelpFormatter
+    )
+    parser_bench.add_argument(
+        'date',
+        help='the year and day in YYYY/DD format (e.g. "2021/01")'
+    )
+    parser_bench.add_argument(
+        '-i', '--input',
+        dest='input_file',
+        default='input.txt',
+        help='input file to time (or to take prefixes of with --scale)'
+    )
+    parser_bench.add_argument(
+        '-f', '--solution-file',
+        dest='solution_file',
+        default='solution',
+        help='solution file to run instead of solution.py\n'
+             '(e.g. "solution2" for solution2.py)'
+    )
+    parser_bench.add_argument(
+        '-n', '--runs',
+        dest='runs',
+        type=int,
+        default=5,
+        help='number of timed runs (per input size with --scale, default: 5)'
+    )
+    parser_bench.add_argument(
+        '--warmup',
+        dest='warmup',
+        type=int,
+        default=1,
+        help='number of untimed runs before timing (default: 1)'
+    )
+    parser_bench.add_argument(
+        '--scale',
+        dest='scale',
+        action='store_true',
+        help='time the solution on growing inputs, fit a complexity curve\n'
+             'and project the run time at the full input size'
+    )
+    parser_bench.add_argument(
+        '--steps',
+        dest='steps',
+        type=int,
+        help='with --scale, halve the input this many times and time\n'
+             'each prefix (default: 5, from 1/32 up to 1/2 of it)'
+    )
+    parser_bench.add_argument(
+        '--generator',
+        dest='generator',
+        help='with --scale, time inputs from generate_input(size) in this\n'
+             'file instead of prefixes (e.g. "gen" for gen.py)'
+    )
+    parser_bench.add_argument(
+        '--sizes',
+        dest='sizes',
+        type=lambda value: [int(size) for size in value.split(',')],
+        help='comma separated sizes for --generator (default: 125,250,500,1000,2000)'
+    )
+    parser_bench.add_argument(
+        '--project',
+        dest='full_size',
+        type=int,
+        help='project the run time at this size\n'
+             '(default: lines in the input file, none with --generator)'
+    )
+    parser_bench.add_argument(
+        '--csv',
+        dest='csv_file',
+        help='also write the --scale timings as CSV to this file'
+    )
+    parser_bench.add_argument(
+        '--json',
+        dest='json_file',
+        help='also write the results as JSON to this file'
+    )
+    parser_race = command_subparsers.add_parser(
+        'race',
+        help='race solution variants against each other on the same input',
+        formatter_class=CustomHelpFormatter
+    )
+    parser_race.add_argument(
+        'date',
+        help='the year and day in YYYY/DD format (e.g. "2021/01")'
+    )
+    parser_race.add_argument(
+        'variants',
+        nargs='+',
+        help='solution files to race (e.g. "solution solution2 solution3"),\n'
+             'solution.py is always included as the baseline'
+    )
+    parser_race.add_argument(
+        '-i', '--input',
+        dest='input_file',
+        default='input.txt',
+        help='input file to race on (default: input.txt)'
+    )
+    parser_race.add_argument(
+        '-n', '--runs',
+        dest='runs',
+        type=int,
+        default=5,
+        help='number of timed runs of each variant (default: 5)'
+    )
+    parser_race.add_argument(
+        '--warmup',
+        dest='warmup',
+        type=int,
+        default=0,
+        help='number of untimed runs before each timed run (default: 0)'
+    )
+    parser_race.add_argument(
+        '--timeout',
+        dest='timeout',
+        type=float,
+        help='give up on a variant after a run takes this many seconds'
+    )
+    parser_race.add_argument(
+        '--json',
+        dest='json_file',
+        help='also write the results as JSON to this file'
+    )
     parser_submit = command_subparsers.add_parser(
         'submit',
         help='run solution and submit answers',
@@ -94,6 +406,9 @@ def main():
              '(e.g. "solution2" for solution2.py)\n'
              '*only works if answers not yet submitted*'
     )
+    add_execution_arguments(parser_submit)
+    add_result_cache_arguments(parser_submit)
+    add_daemon_arguments(parser_submit)
     parser_countdown = command_subparsers.add_parser(
         'countdown',
         help='display countdown to puzzle unlock',
@@ -103,8 +418,55 @@ def main():
         'date',
         help='the year and day in YYYY/DD format (e.g. "2021/01")'
     )
+    parser_countdown.add_argument(
+        '--fetch',
+        dest='fetch',
+        action='store_true',
+        help='download prompt and input as soon as the puzzle unlocks'
+    )
+    parser_countdown.add_argument(
+        '--no-tui',
+        dest='tui',
+        action='store_false',
+        help='print the time left to stdout instead of a full screen display'
+    )
+    parser_daemon = command_subparsers.add_parser(
+        'daemon',
+        help='keep warm workers in the background to make test and submit faster',
+        formatter_class=CustomHelpFormatter
+    )
+    parser_daemon.add_argument(
+        'action',
+        choices=('start', 'stop', 'status', 'run'),
+        help='start or stop the daemon in the background, show its status\n'
+             'or run it in the foreground'
+    )
+    parser_daemon.add_argument(
+        '--idle-timeout',
+        dest='idle_timeout',
+        type=int,
+        help='stop after this many minutes without a request, 0 to never stop\n'
+             '(default: ADVENT_DAEMON_IDLE_TIMEOUT or 30)'
+    )
+    parser_daemon.add_argument(
+        '--preload',
+        dest='preload',
+        type=lambda value: tuple(name for name in value.split(',') if name),
+        help='comma separated modules to import up front, if installed\n'
+             '(default: ADVENT_DAEMON_PRELOAD or numpy,networkx,sympy,scipy)'
+    )
     args = parser.parse_args()
 
+    if args.command in ('get', 'stats'):
+        client.configure_cache(enabled=not args.no_cache, refresh=args.refresh)
+    elif args.command in ('test', 'submit'):
+        # a running daemon has everything imported already, let it do the work
+        if not args.no_daemon and not getattr(args, 'watch', False):
+            code = server.forward(sys.argv[1:])
+            if code is not None:
+                sys.exit(code)
+        results.configure_cache(enabled=not args.no_cache)
+
     if args.command == 'get':
         date = args.date.split('/')
         if len(date) == 0:
@@ -114,7 +476,8 @@ def main():
         day = date[1] if len(date) > 1 else None
 
         if args.subcommand == 'puzzle':
-            commands.get(year, day)
+            client.set_rate_limit(args.rate)
+            commands.get(year, day, jobs=args.jobs)
         elif args.subcommand == 'solution':
             commands.get_solution(year, day)
 
@@ -125,13 +488,52 @@ def main():
             commands.stats(args.year)
 
     elif args.command == 'test':
+        year, _, day = args.date.partition('/')
+        if not day or '-' in day:
+            unsupported = [flag for dest, flag in SINGLE_DAY_FLAGS.items()
+                           if getattr(args, dest) not in (None, False)]
+            if unsupported:
+                parser_test.error(f'{", ".join(unsupported)} only work when testing a '
+                                  f'single day')
+            success = commands.test_year(year, day or None, solution_file=args.solution_file,
+                                         input_file=args.input_file, jobs=args.jobs,
+                                         timeout=args.timeout, sort=args.sort,
+                                         verify_answers=args.verify, fail_fast=args.fail_fast,
+                                         json_file=args.json_file)
+            sys.exit(0 if success else 1)
+        success = commands.test(year, day, solution_file=args.solution_file,
+                                input_file=args.input_file, bench=args.bench, runs=args.runs,
+                                warmup=args.warmup, json_file=args.json_file,
+                                parallel=args.parallel, isolate=args.isolate,
+                                timeout=args.timeout, cpu_limit=args.cpu_limit,
+                                memory_limit=megabytes(args.memory_limit),
+                                verify_answers=args.verify, fail_fast=args.fail_fast,
+                                watch_files=args.watch, profiler=args.profiler,
+                                top=args.top)
+        if args.verify and not success:
+            sys.exit(1)
+
+    elif args.command == 'bench':
         year, day = args.date.split('/')
-        commands.test(year, day, solution_file=args.solution_file, input_file=args.input_file)
+        commands.bench(year, day, solution_file=args.solution_file, input_file=args.input_file,
+                       runs=args.runs, warmup=args.warmup, json_file=args.json_file,
+                       scale=args.scale, steps=args.steps, generator=args.generator,
+                       sizes=args.sizes, full_size=args.full_size, csv_file=args.csv_file)
+
+    elif args.command == 'race':
+        year, day = args.date.split('/')
+        commands.race(year, day, args.variants, input_file=args.input_file, runs=args.runs,
+                      warmup=args.warmup, timeout=args.timeout, json_file=args.json_file)
 
     elif args.command == 'submit':
         year, day = args.date.split('/')
-        commands.submit(year, day, solution_file=args.solution_file)
+        commands.submit(year, day, solution_file=args.solution_file, isolate=args.isolate,
+                        timeout=args.timeout, cpu_limit=args.cpu_limit,
+                        memory_limit=megabytes(args.memory_limit))
+
+    elif args.command == 'daemon':
+        commands.daemon(args.action, idle_timeout=args.idle_timeout, preload=args.preload)
 
     elif args.command == 'countdown':
         year, day = args.date.split('/')
-        commands.countdown(year, day)
+        commands.countdown(year, day, fetch=args.fetch, tui=args.tui)
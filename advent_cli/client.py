@@ -0,0 +1,158 @@
+import os
+import requests
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import cache, config
+
+BASE_URL = 'https://adventofcode.com'
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (5, 30)
+
+# only idempotent requests are retried, an answer must never be submitted twice
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD']),
+    raise_on_status=False
+)
+
+DEFAULT_RATE_LIMIT = config.DEFAULT_RATE_LIMIT
+
+_session = None
+_session_lock = threading.Lock()
+
+_response_cache = None
+_use_cache = True
+_refresh_cache = False
+
+
+class RateLimiter:
+
+    def __init__(self, rate=None):
+        self.set_rate(rate)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def set_rate(self, rate):
+        self.interval = 1 / rate if rate else 0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+_rate_limiter = RateLimiter(DEFAULT_RATE_LIMIT)
+
+
+def set_rate_limit(rate):
+    _rate_limiter.set_rate(rate)
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.cookies.set('session', config.get_config()['session_cookie'],
+                                domain='.adventofcode.com')
+            _session = session
+    return _session
+
+
+def warm_up(connections=2):
+    # opens connections ahead of time, DNS, TCP and TLS included, and leaves them in the
+    # session's pool so the next requests are sent straight away; False if any failed
+    session = get_session()
+
+    def head(_):
+        _rate_limiter.wait()
+        try:
+            session.head(BASE_URL, timeout=TIMEOUT)
+            return True
+        except requests.RequestException:
+            return False
+
+    # at the same time, otherwise every request would go over the same connection
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        return all(executor.map(head, range(connections)))
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def configure_cache(enabled=True, refresh=False):
+    global _use_cache, _refresh_cache
+    _use_cache = enabled
+    _refresh_cache = refresh
+
+
+def get_cache():
+    global _response_cache
+    if _response_cache is None:
+        conf = config.get_config()
+        _response_cache = cache.ResponseCache(
+            os.path.join(conf['cache_dir'], 'http'), conf['cache_max_size']
+        )
+    return _response_cache
+
+
+def _cache_key(url):
+    return get_cache().key(url, config.get_config()['session_cookie'])
+
+
+def get(url, refresh=False, burst=False, **kwargs):
+    # burst skips the rate limit, only for a handful of requests that can't wait
+    kwargs.setdefault('timeout', TIMEOUT)
+    ttl = cache.get_ttl(url) if _use_cache else 0
+    if not ttl:
+        if not burst:
+            _rate_limiter.wait()
+        return get_session().get(url, **kwargs)
+
+    key = _cache_key(url)
+    entry = get_cache().load(key)
+    if entry is not None:
+        if not (refresh or _refresh_cache) and get_cache().is_fresh(entry, ttl):
+            return cache.to_response(entry)
+        kwargs['headers'] = {**kwargs.get('headers', {}), **cache.conditional_headers(entry)}
+
+    if not burst:
+        _rate_limiter.wait()
+    r = get_session().get(url, **kwargs)
+    if r.status_code == 304 and entry is not None:
+        get_cache().revalidated(key, entry)
+        return cache.to_response(entry)
+    if r.status_code == 200 and '[Log In]' not in r.text:
+        get_cache().store(key, r)
+    return r
+
+
+def post(url, data=None, **kwargs):
+    kwargs.setdefault('timeout', TIMEOUT)
+    _rate_limiter.wait()
+    r = get_session().post(url, data=data, **kwargs)
+    if _use_cache and url.endswith('/answer'):
+        # the puzzle page changes once an answer is accepted
+        get_cache().invalidate(_cache_key(url[:-len('/answer')]))
+    return r
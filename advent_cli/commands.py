@@ -1,26 +1,44 @@
-import curses
 import os
-import pytz
 import re
-import requests
 import sys
+import threading
 import time
 
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
-from tabulate import tabulate
-from jinja2 import Template
 
-from . import config
+from . import config, render, results, verify
+from .bench import benchmark, format_bytes, format_json, format_ns, format_table
+from .verify import Verdict
 from .utils import (
     colored,
     compute_answers,
+    compute_answers_parallel,
     custom_markdownify,
-    get_time_until_unlock,
+    get_unlock_time,
     submit_answer,
+    lazy_import,
+    PartTimeout,
     Status
 )
 
+batch = lazy_import('advent_cli.batch')
+client = lazy_import('advent_cli.client')
+curses = lazy_import('curses')
+isolation = lazy_import('advent_cli.isolation')
+jinja2 = lazy_import('jinja2')
+leaderboard = lazy_import('advent_cli.leaderboard')
+parsing = lazy_import('advent_cli.parsing')
+profiling = lazy_import('advent_cli.profiling')
+pytz = lazy_import('pytz')
+racing = lazy_import('advent_cli.racing')
+scaling = lazy_import('advent_cli.scaling')
+schedule = lazy_import('advent_cli.schedule')
+server = lazy_import('advent_cli.server')
+tabulate = lazy_import('tabulate')
+unlock = lazy_import('advent_cli.unlock')
+watch = lazy_import('advent_cli.watch')
+
 INPUT_FILE_NAME = "input.txt"
 
 def get_solution(year, day):
@@ -29,9 +47,7 @@ def get_solution(year, day):
         print(colored(f'  {os.getcwd()}/{year}/{day}/', 'red'))
         return
 
-    conf = config.get_config()
-    r = requests.get(f'https://adventofcode.com/{year}/day/{int(day)}',
-                     cookies={'session': conf['session_cookie']})
+    r = client.get(f'https://adventofcode.com/{year}/day/{int(day)}', refresh=True)
     if r.status_code == 404:
         if 'before it unlocks!' in r.text:
             print(colored('This puzzle has not unlocked yet.', 'red'))
@@ -48,7 +64,7 @@ def get_solution(year, day):
         print(colored('Session cookie is invalid or expired.', 'red'))
         return
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    soup = parsing.make_main_soup(r.text, parse_only=parsing.PARAGRAPHS)
     def find_solutions(element):
         if element.name == 'p' and re.search(r'Your puzzle answer was', element.text):
             return True
@@ -71,15 +87,23 @@ def get_solution(year, day):
     
     print(colored('All solutions written.', 'green'))
 
+def fetch_puzzle_day(year, day):
+    prompt = client.get(f'https://adventofcode.com/{year}/day/{int(day)}')
+    if prompt.status_code == 404 or '[Log In]' in prompt.text:
+        return prompt, None
+    return prompt, client.get(f'https://adventofcode.com/{year}/day/{int(day)}/input')
+
+
 def get_puzzle_day(year, day):
     if os.path.exists(f'{year}/{day}/'):
         print(colored('Directory already exists:', 'red'))
         print(colored(f'  {os.getcwd()}/{year}/{day}/', 'red'))
         return
 
-    conf = config.get_config()
-    r = requests.get(f'https://adventofcode.com/{year}/day/{int(day)}',
-                     cookies={'session': conf['session_cookie']})
+    write_puzzle_day(year, day, *fetch_puzzle_day(year, day))
+
+
+def write_puzzle_day(year, day, r, r_input):
     if r.status_code == 404:
         if 'before it unlocks!' in r.text:
             print(colored('This puzzle has not unlocked yet.', 'red'))
@@ -98,7 +122,7 @@ def get_puzzle_day(year, day):
 
     os.makedirs(f'{year}/{day}/')
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    soup = parsing.make_main_soup(r.text, parse_only=parsing.DAY_DESC)
     parts = soup.find_all('article', class_='day-desc')
 
     part1_html = parts[0].decode_contents()
@@ -117,16 +141,14 @@ def get_puzzle_day(year, day):
             f.write(custom_markdownify(part2_html))
     print(f'Downloaded prompt to {year}/{day}/prompt.md')
 
-    r = requests.get(f'https://adventofcode.com/{year}/day/{int(day)}/input',
-                     cookies={'session': conf['session_cookie']})
     with open(f'{year}/{day}/{INPUT_FILE_NAME}', 'w') as f:
-        f.write(r.text)
+        f.write(r_input.text)
     print(f'Downloaded input to {year}/{day}/{INPUT_FILE_NAME}')
 
     open(f'{year}/{day}/example_input.txt', 'w').close()
     print(f'Created {year}/{day}/example_input.txt')
 
-    template = Template("""## Advent of Code {{ year }}
+    template = jinja2.Template("""## Advent of Code {{ year }}
 ## https://adventofcode.com/{{ year }}/day/{{ day }}
 ## {{ title }}
 
@@ -154,17 +176,32 @@ if __name__ == "__main__":
         f.write(template.render(year=year, day=day, title=title))
     print(f'Created {year}/{day}/solution.py')
 
-def get(year, day):
-    if day is None:
-        curr_date = dt.now(pytz.timezone('America/New_York'))
-        if year < curr_date.year:
-            for day in range(1, 26):
-                get_puzzle_day(year, day)
-        else:
-            for day in range(1, curr_date.day + 1):
-                get_puzzle_day(year, day)
-    else:
+def get(year, day, jobs=1):
+    if day is not None:
         get_puzzle_day(year, day)
+        return
+
+    curr_date = dt.now(pytz.timezone('America/New_York'))
+    last_day = 25 if int(year) < curr_date.year else curr_date.day
+    days = [f'{d:02}' for d in range(1, last_day + 1)]
+
+    # fetch concurrently, but write files and print in day order
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = {
+            day: executor.submit(fetch_puzzle_day, year, day)
+            for day in days if not os.path.exists(f'{year}/{day}/')
+        }
+        for day in days:
+            if day not in futures:
+                print(colored('Directory already exists:', 'red'))
+                print(colored(f'  {os.getcwd()}/{year}/{day}/', 'red'))
+                continue
+            try:
+                write_puzzle_day(year, day, *futures[day].result())
+            except Exception as e:
+                print(colored(f'Failed to download {year}/{day}:', 'red'))
+                print(colored(f'  {e}', 'red'))
+
 
 def stats(year):
     today = dt.today()
@@ -173,13 +210,12 @@ def stats(year):
         year = str(today.year - 1)
 
     conf = config.get_config()
-    r = requests.get(f'https://adventofcode.com/{year}/leaderboard/self',
-                     cookies={'session': conf['session_cookie']})
+    r = client.get(f'https://adventofcode.com/{year}/leaderboard/self')
     if '[Log In]' in r.text:
         print(colored('Session cookie is invalid or expired.', 'red'))
         return
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    soup = parsing.make_main_soup(r.text, parse_only=parsing.ARTICLES)
 
     table = soup.select('article pre')[0].text
     table_rows = [x.split() for x in table.split('\n')[2:-1]]
@@ -190,25 +226,17 @@ def stats(year):
                                            else 1 if row[1:4] != ['-', '-', '-'] \
                                            else 0
 
-    print('\n         1111111111222222\n1234567890123456789012345')
-
     today = dt.now(pytz.timezone('America/New_York'))
-    for i, stars in enumerate(stars_per_day):
-        if stars == 2:
-            print(colored('*', 'yellow'), end='')
-        elif stars == 1:
-            print(colored('*', 'cyan'), end='')
-        elif stars == 0 and today.year == int(year) and today.day < (i + 1):
-            print(' ', end='')
-        else:
-            print(colored('*', 'grey'), end='')
+    levels = [None if stars == 0 and today.year == int(year) and today.day < (i + 1)
+              else stars for i, stars in enumerate(stars_per_day)]
 
-    print(f" ({sum(stars_per_day)}{colored('*', 'yellow')})\n")
-    print(f'({colored("*", "yellow")} 2 stars) '
-          f'({colored("*", "cyan")} 1 star) '
-          f'({colored("*", "grey")} 0 stars)\n')
+    out = render.Buffer()
+    out.print('\n         1111111111222222\n1234567890123456789012345')
+    out.print(render.render_stars(levels), end='')
+    out.print(f" ({sum(stars_per_day)}{colored('*', 'yellow')})\n")
+    out.print(f'{render.render_star_legend()}\n')
 
-    print(tabulate(table_rows, stralign='right', headers=[
+    out.print(tabulate.tabulate(table_rows, stralign='right', headers=[
         '\nDay',
         *['\n'.join([colored(y, 'cyan') for y in x.split('\n')])
             for x in ['----\nTime', '(Part 1)\nRank', '----\nScore']],
@@ -218,22 +246,54 @@ def stats(year):
 
     if conf['private_leaderboards']:
         num_private_leaderboards = len(conf['private_leaderboards'])
-        print(colored(f'You are a member of {num_private_leaderboards} '
-                      f'private leaderboard(s).', 'grey'))
-        print(colored(f'Use "advent stats {year} --private" to see them.\n', 'grey'))
+        out.print(colored(f'You are a member of {num_private_leaderboards} '
+                          f'private leaderboard(s).', 'grey'))
+        out.print(colored(f'Use "advent stats {year} --private" to see them.\n', 'grey'))
+    out.flush()
 
 
 def show_private_leaderboard(year, board_id):
-    conf = config.get_config()
-    r = requests.get(
-                f'https://adventofcode.com/{year}/leaderboard/private/view/{board_id}',
-                cookies={'session': conf['session_cookie']}
-            )
+    r = client.get(f'https://adventofcode.com/{year}/leaderboard/private/view/{board_id}.json')
+    board = None
+    if r.status_code == 200:
+        try:
+            board = leaderboard.parse_leaderboard(r.json())
+        except (ValueError, KeyError, TypeError):
+            pass
+    if board is None:
+        # not logged in or JSON not available, fall back to scraping the page
+        show_private_leaderboard_html(year, board_id)
+        return
+
+    positions = leaderboard.get_positions(board.members)
+    unlocked_days = leaderboard.count_unlocked_days(year, board.num_days)
+    top_score_len = len(str(board.members[0].local_score)) if board.members else 1
+    position_len = max(len(str(len(board.members))), 2) + 1
+    out = render.Buffer()
+    out.print(f"\n{board.owner}'s private leaderboard {colored(f'({board_id})', 'grey')}")
+    out.print(f'\n{" "*(position_len+top_score_len+11)}1111111111222222'
+              f'\n{" "*(position_len+top_score_len+2)}1234567890123456789012345')
+
+    for position, member in zip(positions, board.members):
+        position = f'{position})' if position is not None else ''
+        stars = render.render_stars(
+            leaderboard.get_star_map(member, board.num_days, unlocked_days)
+        )
+        out.print(f'{position:>{position_len}} {member.local_score:>{top_score_len}} '
+                  f'{stars} {member.display_name}')
+
+    out.print()
+    out.print(f'{render.render_star_legend()}\n')
+    out.flush()
+
+
+def show_private_leaderboard_html(year, board_id):
+    r = client.get(f'https://adventofcode.com/{year}/leaderboard/private/view/{board_id}')
     if '[Log In]' in r.text:
         print(colored('Session cookie is invalid or expired.', 'red'))
         return
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    soup = parsing.make_soup(r.text)
 
     intro_text = soup.select('article p')[0].text
     board_owner = soup.find('div', class_='user').contents[0].strip() \
@@ -243,9 +303,10 @@ def show_private_leaderboard(year, board_id):
     rows = soup.find_all('div', class_='privboard-row')[1:]
 
     top_score_len = len(rows[0].find_all(text=True, recursive=False)[0].strip())
-    print(f"\n{board_owner}'s private leaderboard {colored(f'({board_id})', 'grey')}")
-    print(f'\n{" "*(top_score_len+14)}1111111111222222'
-            f'\n{" "*(top_score_len+5)}1234567890123456789012345')
+    out = render.Buffer()
+    out.print(f"\n{board_owner}'s private leaderboard {colored(f'({board_id})', 'grey')}")
+    out.print(f'\n{" "*(top_score_len+14)}1111111111222222'
+              f'\n{" "*(top_score_len+5)}1234567890123456789012345')
 
     for row in rows:
         position = row.find('span', class_='privboard-position')
@@ -259,25 +320,26 @@ def show_private_leaderboard(year, board_id):
             if len(row.select('.privboard-name a')) else None
         score = row.find_all(text=True, recursive=False)[0].strip()
 
-        print(f'{position} {score:>{top_score_len}}', end=' ')
+        levels = []
         for span in stars:
             class_ = span.attrs['class'][0]
             if 'both' in class_:
-                print(colored('*', 'yellow'), end='')
+                levels.append(2)
             elif 'firstonly' in class_:
-                print(colored('*', 'cyan'), end='')
+                levels.append(1)
             elif 'unlocked' in class_:
-                print(colored('*', 'grey'), end='')
+                levels.append(0)
             elif 'locked' in class_:
-                print(' ', end='')
+                levels.append(None)
 
-        print(f' {name}', end=' ')
-        print(f'({colored(name_link, "blue")})' if name_link is not None else '')
+        out.print(f'{position} {score:>{top_score_len}}', end=' ')
+        out.print(render.render_stars(levels), end='')
+        out.print(f' {name}', end=' ')
+        out.print(f'({colored(name_link, "blue")})' if name_link is not None else '')
 
-    print()
-    print(f'({colored("*", "yellow")} 2 stars) '
-            f'({colored("*", "cyan")} 1 star) '
-            f'({colored("*", "grey")} 0 stars)\n')
+    out.print()
+    out.print(f'{render.render_star_legend()}\n')
+    out.flush()
 
 def private_leaderboard_stats(year):
     today = dt.today()
@@ -290,16 +352,13 @@ def private_leaderboard_stats(year):
         for board_id in conf['private_leaderboards']:
             show_private_leaderboard(year, board_id)
     else:
-        r = requests.get(
-                f'https://adventofcode.com/{year}/leaderboard/private',
-                cookies={'session': conf['session_cookie']}
-            )
+        r = client.get(f'https://adventofcode.com/{year}/leaderboard/private')
         if '[Log In]' in r.text:
             print(colored('Session cookie is invalid or expired.', 'red'))
             return
-        soup = BeautifulSoup(r.text, 'html.parser')
+        soup = parsing.make_main_soup(r.text, parse_only=parsing.PRIVATE_BOARD_LINKS)
 
-        links = soup.find_all('a', href=re.compile(r'/leaderboard/private/view'))
+        links = soup.find_all('a')
 
         if not links:
             print(colored('You are not a member of any private leaderboards', 'red'))
@@ -307,53 +366,334 @@ def private_leaderboard_stats(year):
             for link in links:
                 show_private_leaderboard(year, link.attrs['href'].split('/')[-1])
 
-def test(year, day, solution_file='solution', input_file=None):
+def run_solution(year, day, file_path, solution_file='solution', parallel=False, isolate=False,
+                 timeout=None, cpu_limit=None, memory_limit=None, expected_part1=None):
+    # returns the answers, or None after reporting why the run failed
+    key, entry = results.lookup(year, day, file_path, solution_file)
+    if entry is not None:
+        computed = dt.fromtimestamp(entry['time']).strftime('%Y-%m-%d %H:%M:%S')
+        print(colored(f'(Cached answers from {computed}, took {entry["elapsed"]:.3f}s to '
+                      'compute, use --no-cache to run again)', 'grey'))
+        return entry['answers']
+
+    start = time.monotonic()
+    answers = execute_solution(year, day, file_path, solution_file=solution_file,
+                               parallel=parallel, isolate=isolate, timeout=timeout,
+                               cpu_limit=cpu_limit, memory_limit=memory_limit,
+                               expected_part1=expected_part1)
+    # a part 2 skipped by --fail-fast isn't its real answer
+    if answers is not None and expected_part1 is None:
+        results.store(key, answers, time.monotonic() - start)
+    return answers
+
+
+def execute_solution(year, day, file_path, solution_file='solution', parallel=False,
+                     isolate=False, timeout=None, cpu_limit=None, memory_limit=None,
+                     expected_part1=None):
+    if isolate:
+        result = isolation.run_isolated(year, day, file_path, solution_file=solution_file,
+                                        timeout=timeout, cpu_limit=cpu_limit,
+                                        memory_limit=memory_limit,
+                                        expected_part1=expected_part1)
+        if result.status == isolation.RunStatus.OK:
+            return result.answers
+        elif result.status == isolation.RunStatus.TIMEOUT:
+            print(colored(f'Solution timed out after {timeout} seconds', 'red'))
+        elif result.status == isolation.RunStatus.CPU_LIMIT:
+            print(colored(f'Solution exceeded the CPU time limit ({cpu_limit} seconds)',
+                          'red'))
+        elif result.status == isolation.RunStatus.OUT_OF_MEMORY:
+            print(colored('Solution ran out of memory', 'red'))
+        elif result.status == isolation.RunStatus.ERROR:
+            print(colored('Solution raised an exception:', 'red'))
+            print(result.error, end='')
+        else:
+            print(colored(f'Solution process exited with code {result.exitcode}', 'red'))
+        return None
+
+    if parallel:
+        try:
+            return compute_answers_parallel(year, day, file_path=file_path,
+                                            solution_file=solution_file, timeout=timeout)
+        except PartTimeout as e:
+            print(colored(str(e), 'red'))
+            return None
+
+    keys = results.stage_keys(year, day, file_path, solution_file)
+    if keys is None:
+        return compute_answers(year, day, file_path=file_path, solution_file=solution_file,
+                               expected_part1=expected_part1)
+    answers, hits = results.compute_stages(year, day, file_path, keys,
+                                           solution_file=solution_file,
+                                           expected_part1=expected_part1)
+    if hits:
+        print(colored(f'(Unchanged since the last run, reused cached {", ".join(hits)})',
+                      'grey'))
+    return answers
+
+
+def report_verdicts(year, day, answers, expected, verdicts, json_file=None):
+    for part, answer, expected_answer, verdict in zip((1, 2), answers, expected, verdicts):
+        if verdict == Verdict.PASS:
+            print(colored(f'Part {part} matches solution{part}.txt', 'green'))
+        elif verdict == Verdict.FAIL:
+            print(colored(f'Part {part} does not match solution{part}.txt '
+                          f'(expected {expected_answer})', 'red'))
+        elif verdict == Verdict.MISSING:
+            print(colored(f'No stored answer for part {part} (solution{part}.txt)', 'grey'))
+        else:
+            print(colored(f'Part {part} skipped', 'grey'))
+    if json_file is not None:
+        with open(json_file, 'w') as f:
+            f.write(verify.format_json([
+                verify.to_record(year, day, answers, expected, verdicts)
+            ]))
+        print(f'Wrote verification results to {json_file}')
+
+
+def resolve_input_file(year, day, input_file):
+    if input_file is None:
+        return f'{os.getcwd()}/{year}/{day}/{INPUT_FILE_NAME}'
+    # check if input_file is a valid path file or a valid file in the current directory
+    if os.path.exists(f'{os.getcwd()}/{year}/{day}/{input_file}'):
+        return f'{os.getcwd()}/{year}/{day}/{input_file}'
+    if not os.path.exists(input_file):
+        print(colored('Example input file does not exist:', 'red'))
+        print(colored(f'  {os.getcwd()}/{year}/{day}/{input_file}', 'red'))
+    return input_file
+
+
+def check_solution_file(year, day, solution_file):
+    if solution_file != 'solution':
+        if not os.path.exists(f'{year}/{day}/{solution_file}.py'):
+            print(colored('Solution file does not exist:', 'red'))
+            print(colored(f'  "{os.getcwd()}/{year}/{day}/{solution_file}.py"', 'red'))
+            return False
+        print(colored(f'(Using {solution_file}.py)', 'red'))
+    return True
+
+
+def print_benchmark(year, day, input_file, solution_file='solution', runs=5, warmup=1,
+                    json_file=None):
+    result = benchmark(year, day, input_file, solution_file=solution_file,
+                       runs=runs, warmup=warmup)
+    print(f'{colored("Part 1:", "cyan")} {result["answers"]["part1"]}')
+    print(f'{colored("Part 2:", "yellow")} {result["answers"]["part2"]}')
+    print(f'\n{format_table(result)}\n')
+    fan_out = result['fan_out']
+    print(f'Data for part 1 and part 2 ({fan_out["policy"]}): '
+          f'{format_bytes(fan_out["peak_memory"])} in {format_ns(fan_out["time"])}')
+    print(colored(f'({result["runs"]} runs after {warmup} warmup)', 'grey'))
+    if json_file is not None:
+        with open(json_file, 'w') as f:
+            f.write(format_json(result))
+        print(f'Wrote benchmark results to {json_file}')
+
+
+def test(year, day, solution_file='solution', input_file=None, bench=False, runs=5,
+         warmup=1, json_file=None, parallel=False, isolate=False, timeout=None,
+         cpu_limit=None, memory_limit=None, verify_answers=False, fail_fast=False,
+         watch_files=False, profiler=None, top=15):
 
     if not os.path.exists(f'{year}/{day}/'):
         print(colored('Directory does not exist:', 'red'))
         print(colored(f'  "{os.getcwd()}/{year}/{day}/"', 'red'))
         return
 
-    if input_file is not None:
-        # check if input_file is a valid path file or a valid file in the current directory
-        if os.path.exists(f'{os.getcwd()}/{year}/{day}/{input_file}'):
-            input_file = f'{os.getcwd()}/{year}/{day}/{input_file}'
-        elif os.path.exists(input_file):
-            input_file = input_file
-        else:
-            print(colored('Example input file does not exist:', 'red'))
-            print(colored(f'  {os.getcwd()}/{year}/{day}/{input_file}', 'red'))
-    else:
-        input_file = f'{os.getcwd()}/{year}/{day}/{INPUT_FILE_NAME}'
-
+    input_file = resolve_input_file(year, day, input_file)
     print(f'Using input file: {input_file}')
-    if solution_file != 'solution':
-        if not os.path.exists(f'{year}/{day}/{solution_file}.py'):
-            print(colored('Solution file does not exist:', 'red'))
-            print(colored(f'  "{os.getcwd()}/{year}/{day}/{solution_file}.py"', 'red'))
-            return
-        print(colored(f'(Using {solution_file}.py)', 'red'))
+    if not check_solution_file(year, day, solution_file):
+        return
+
+    if watch_files:
+        watch.watch(year, day, input_file, solution_file=solution_file, timeout=timeout)
+        return
+
+    if bench:
+        print_benchmark(year, day, input_file, solution_file=solution_file, runs=runs,
+                        warmup=warmup, json_file=json_file)
+        return
 
-    part1_answer, part2_answer = compute_answers(year, day,
-                                                 file_path=input_file,
-                                                 solution_file=solution_file)
+    if profiler is not None:
+        answers, stages, own_files = profiling.profile(year, day, input_file,
+                                                       solution_file=solution_file,
+                                                       profiler=profiler, top=top)
+        print(f'{colored("Part 1:", "cyan")} {answers[0]}')
+        print(f'{colored("Part 2:", "yellow")} {answers[1]}')
+        for stage, result in stages.items():
+            print(f'\n{colored(stage, "magenta")} {format_ns(result["elapsed"])}')
+            if result['functions']:
+                print(profiling.format_table(result['functions']))
+            else:
+                print(colored('(no time recorded in the solution files)', 'grey'))
+        print()
+        for path in profiling.write_profiles(year, day, solution_file, stages, own_files):
+            print(f'Wrote {os.path.relpath(path)}')
+        return
+
+    expected = verify.read_expected(year, day) if verify_answers else (None, None)
+    answers = run_solution(year, day, input_file, solution_file=solution_file,
+                           parallel=parallel, isolate=isolate, timeout=timeout,
+                           cpu_limit=cpu_limit, memory_limit=memory_limit,
+                           expected_part1=expected[0] if fail_fast else None)
+    if answers is None:
+        return False if verify_answers else None
+    part1_answer, part2_answer = answers
     if part1_answer is not None:
         print(f'{colored("Part 1:", "cyan")} {part1_answer}')
         if part2_answer is not None:
             print(f'{colored("Part 2:", "yellow")} {part2_answer}')
     else:
         print(colored('No solution implemented', 'red'))
-        return
+        if not verify_answers:
+            return
+
+    if verify_answers:
+        verdicts = verify.verify_answers(answers, expected, fail_fast=fail_fast)
+        report_verdicts(year, day, answers, expected, verdicts, json_file=json_file)
+        return verify.passed(verdicts)
 
     if solution_file != 'solution':
-        part1_answer_orig, part2_answer_orig = compute_answers(year, day, file_path=input_file)
+        reference, cached = results.reference_answers(year, day, input_file)
+        part1_answer_orig, part2_answer_orig = reference
+        if cached:
+            print(colored('(solution.py answers from cache)', 'grey'))
         if part1_answer == part1_answer_orig and part2_answer == part2_answer_orig:
             print(colored('Output matches solution.py', 'green'))
         else:
             print(colored('Output does not match solution.py', 'red'))
 
 
-def submit(year, day, solution_file='solution'):
+def test_year(year, days=None, solution_file='solution', input_file=INPUT_FILE_NAME, jobs=None,
+              timeout=None, sort='day', verify_answers=False, fail_fast=False, json_file=None):
+
+    first, last = batch.parse_day_range(days)
+    day_dirs = batch.find_days(year, first, last, solution_file=solution_file)
+    if not day_dirs:
+        print(colored(f'No {solution_file}.py files found in:', 'red'))
+        print(colored(f'  "{os.getcwd()}/{year}/"', 'red'))
+        return False
+
+    day_results = batch.run_batch(year, day_dirs, solution_file=solution_file,
+                                  input_file=input_file, jobs=jobs, timeout=timeout,
+                                  verify=verify_answers, fail_fast=fail_fast)
+    print(f'\n{batch.format_summary(day_results, sort=sort)}\n')
+
+    for day, result, _ in day_results:
+        if result.error is not None:
+            print(colored(f'{year}/{day}: {result.error.strip().splitlines()[-1]}', 'red'))
+
+    if verify_answers and json_file is not None:
+        with open(json_file, 'w') as f:
+            f.write(verify.format_json(batch.to_records(year, day_results)))
+        print(f'Wrote verification results to {json_file}')
+
+    failures = batch.count_failures(day_results)
+    if failures:
+        print(colored(f'{failures} of {len(day_results)} day(s) failed', 'red'))
+    else:
+        print(colored(f'All {len(day_results)} day(s) ran successfully', 'green'))
+    return failures == 0
+
+
+def bench(year, day, solution_file='solution', input_file=None, runs=5, warmup=1,
+          json_file=None, scale=False, steps=None, generator=None, sizes=None, full_size=None,
+          csv_file=None):
+
+    if not os.path.exists(f'{year}/{day}/'):
+        print(colored('Directory does not exist:', 'red'))
+        print(colored(f'  "{os.getcwd()}/{year}/{day}/"', 'red'))
+        return
+
+    input_file = resolve_input_file(year, day, input_file)
+    if not check_solution_file(year, day, solution_file):
+        return
+
+    if not scale:
+        print(f'Using input file: {input_file}')
+        print_benchmark(year, day, input_file, solution_file=solution_file, runs=runs,
+                        warmup=warmup, json_file=json_file)
+        return
+
+    if generator is not None:
+        if not os.path.exists(f'{year}/{day}/{generator}.py'):
+            print(colored('Generator file does not exist:', 'red'))
+            print(colored(f'  "{os.getcwd()}/{year}/{day}/{generator}.py"', 'red'))
+            return
+        print(f'Using inputs from {generator}.generate_input')
+    elif not os.path.exists(input_file):
+        return
+    else:
+        print(f'Using prefixes of input file: {input_file}')
+
+    result = scaling.scale(year, day, input_file, solution_file=solution_file,
+                           steps=steps or scaling.DEFAULT_STEPS, runs=runs, warmup=warmup,
+                           generator=generator, sizes=sizes, full_size=full_size)
+    print(f'\n{scaling.format_table(result)}\n')
+    print(f'{scaling.format_fit_table(result)}\n')
+    print(colored(f'(best of {result["runs"]} runs per size, '
+                  'fits are empirical, check them against the table)', 'grey'))
+    for path, contents in ((csv_file, scaling.format_csv), (json_file, scaling.format_json)):
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(contents(result))
+            print(f'Wrote scaling results to {path}')
+
+
+def race(year, day, variants, input_file=None, runs=5, warmup=0, timeout=None,
+         json_file=None):
+
+    if not os.path.exists(f'{year}/{day}/'):
+        print(colored('Directory does not exist:', 'red'))
+        print(colored(f'  "{os.getcwd()}/{year}/{day}/"', 'red'))
+        return
+
+    variants = list(dict.fromkeys(variant[:-3] if variant.endswith('.py') else variant
+                                  for variant in variants))
+    missing = [variant for variant in variants
+               if not os.path.exists(f'{year}/{day}/{variant}.py')]
+    if missing:
+        print(colored('Solution file does not exist:', 'red'))
+        for variant in missing:
+            print(colored(f'  "{os.getcwd()}/{year}/{day}/{variant}.py"', 'red'))
+        return
+    baseline = racing.BASELINE
+    if baseline not in variants:
+        if os.path.exists(f'{year}/{day}/{baseline}.py'):
+            variants.insert(0, baseline)
+        else:
+            baseline = variants[0]
+
+    input_file = resolve_input_file(year, day, input_file)
+    print(f'Using input file: {input_file}')
+    print(colored(f'(Racing {", ".join(f"{variant}.py" for variant in variants)}, '
+                  f'{runs} runs each)', 'grey'))
+    result = racing.race(year, day, input_file, variants, runs=runs, warmup=warmup,
+                         timeout=timeout, baseline=baseline)
+    print(f'\n{racing.format_table(result)}\n')
+
+    for variant_result in result['results']:
+        name = f'{variant_result["variant"]}.py'
+        if variant_result['status'] == 'error':
+            print(colored(f'{name} raised an exception:', 'red'))
+            print(variant_result['error'], end='')
+        elif variant_result['status'] == 'timeout':
+            print(colored(f'{name} timed out after {timeout} seconds', 'red'))
+        elif variant_result['status'] != 'ok':
+            print(colored(f'{name} {variant_result["status"].replace("_", " ")}', 'red'))
+        elif variant_result['agrees'] is False:
+            part1_answer, part2_answer = variant_result['answers']
+            print(colored(f'{name} answers differ from {baseline}.py: '
+                          f'{part1_answer}, {part2_answer}', 'red'))
+
+    if json_file is not None:
+        with open(json_file, 'w') as f:
+            f.write(racing.format_json(result))
+        print(f'Wrote race results to {json_file}')
+
+
+def submit(year, day, solution_file='solution', isolate=False, timeout=None, cpu_limit=None,
+           memory_limit=None):
 
     if not os.path.exists(f'{year}/{day}/'):
         print(colored('Directory does not exist:', 'red'))
@@ -367,7 +707,12 @@ def submit(year, day, solution_file='solution'):
             return
         print(colored(f'(Using {solution_file}.py)', 'red'))
 
-    part1_answer, part2_answer = compute_answers(year, day, file_path=os.path.join(os.getcwd(), year, day, INPUT_FILE_NAME), solution_file=solution_file)
+    answers = run_solution(year, day, os.path.join(os.getcwd(), year, day, INPUT_FILE_NAME),
+                           solution_file=solution_file, isolate=isolate, timeout=timeout,
+                           cpu_limit=cpu_limit, memory_limit=memory_limit)
+    if answers is None:
+        return
+    part1_answer, part2_answer = answers
 
     status, response = None, None
     if part2_answer is not None:
@@ -387,10 +732,8 @@ def submit(year, day, solution_file='solution'):
             print(f'Day {int(day)} complete!')
         elif part1_answer is not None:
             print(colored('*', 'cyan'))
-            conf = config.get_config()
-            r = requests.get(f'https://adventofcode.com/{year}/day/{int(day)}',
-                             cookies={'session': conf['session_cookie']})
-            soup = BeautifulSoup(r.text, 'html.parser')
+            r = client.get(f'https://adventofcode.com/{year}/day/{int(day)}', refresh=True)
+            soup = parsing.make_main_soup(r.text, parse_only=parsing.DAY_DESC)
             part2_html = soup.find_all('article', class_='day-desc')[1].decode_contents()
 
             # remove hyphens from title sections, makes markdown look nicer
@@ -420,21 +763,104 @@ def submit(year, day, solution_file='solution'):
         print(response)
 
 
-def countdown(year, day):
+def daemon(action, idle_timeout=None, preload=None):
+    if not server.SUPPORTED:
+        print(colored('The daemon needs fork() and Unix sockets, '
+                      'which this platform does not have', 'red'))
+        return
+    conf = config.get_config()
+    idle_timeout = conf['daemon_idle_timeout'] if idle_timeout is None else idle_timeout
+    preload = conf['daemon_preload'] if preload is None else preload
+
+    if action == 'run':
+        server.Daemon(server.socket_path(), idle_timeout * 60, preload).serve()
+        return
+
+    info = server.status()
+    if action == 'start':
+        if info is not None:
+            print(colored(f'Daemon is already running (pid {info["pid"]})', 'grey'))
+            return
+        pid = server.start(idle_timeout, preload)
+        if pid is None:
+            print(colored('Daemon failed to start, see the log:', 'red'))
+            print(colored(f'  {server.log_path()}', 'red'))
+            return
+        print(f'Started daemon (pid {pid})')
+    elif action == 'stop':
+        if server.stop():
+            print('Stopped daemon')
+        else:
+            print(colored('Daemon is not running', 'grey'))
+    elif info is None:
+        print(colored('Daemon is not running', 'grey'))
+    else:
+        idle = f'{info["idle_timeout"] // 60} minutes' if info['idle_timeout'] else 'never'
+        rows = [
+            ['PID', info['pid']],
+            ['Version', f'advent-cli {info["version"]} on Python {info["python"]}'],
+            ['Socket', info['socket']],
+            ['Up since', f'{dt.fromtimestamp(info["started"]):%Y-%m-%d %H:%M:%S}'],
+            ['Runs', f'{info["served"]} done, {info["running"]} running'],
+            ['Preloaded', ', '.join(info['preloaded']) or '-'],
+            ['Idle shutdown', idle],
+        ]
+        print(tabulate.tabulate(rows, tablefmt='plain'))
+
+
+def fetch_at_unlock(year, day):
+    unlock.wait_for_unlock(year, day)
+    prompt, r_input = unlock.fetch_puzzle_day(year, day)
+    if prompt.status_code == 200 and '[Log In]' not in prompt.text \
+            and r_input.status_code != 200:
+        print(colored(f'The server returned error {r_input.status_code} for the input.',
+                      'red'))
+        return
+    write_puzzle_day(year, day, prompt, r_input)
+    if prompt.status_code == 200 and '[Log In]' not in prompt.text:
+        print(colored(f'Done {-unlock.seconds_until_unlock(year, day):.2f}s after unlock',
+                      'grey'))
+
+
+def print_countdown(year, day, target):
+    # one line per minute for logs, or the same line redrawn every second in a terminal
+    tty = sys.stdout.isatty()
+    print(f'{year} day {int(day)} will unlock in:')
+    for left in schedule.ticks(target, step=1 if tty else 60):
+        if not left:
+            break
+        hours, minutes, seconds = schedule.split_seconds(left)
+        line = f'{hours} hours, {minutes} minutes, {seconds} seconds'
+        if tty:
+            print(f'\r{line}  ', end='', flush=True)
+        else:
+            print(line, flush=True)
+    if tty:
+        print()
 
-    now = dt.now().astimezone(pytz.timezone('EST'))
+
+def countdown(year, day, fetch=False, tui=True):
+
+    unlock_time = get_unlock_time(year, day)
+    now = dt.now().astimezone(unlock_time.tzinfo)
 
     if now.year != int(year):
         print(colored(f'Date must be from the current year ({now.year}).', 'red'))
         return
 
-    if now > dt(int(year), 12, int(day)).astimezone(pytz.timezone('EST')):
+    if now > unlock_time:
         print(colored('That puzzle has already been unlocked.', 'red'))
         return
 
+    if fetch and os.path.exists(f'{year}/{day}/'):
+        print(colored('Directory already exists:', 'red'))
+        print(colored(f'  {os.getcwd()}/{year}/{day}/', 'red'))
+        return
+
+    target = schedule.deadline(unlock_time.timestamp())
+
     def curses_countdown(stdscr):  # pragma: no cover
         curses.cbreak()
-        curses.halfdelay(2)
         curses.use_default_colors()
         if config.get_config()['disable_color']:
             for i in range(1, 4):
@@ -443,8 +869,17 @@ def countdown(year, day):
             curses.init_pair(1, curses.COLOR_MAGENTA, -1)
             curses.init_pair(2, curses.COLOR_YELLOW, -1)
             curses.init_pair(3, curses.COLOR_RED, -1)
-        hours, minutes, seconds = get_time_until_unlock(year, day)
-        while any((hours, minutes, seconds)):
+
+        def wait_for_key(seconds):
+            # blocks until the timeout or a key press, rounded up so it never wakes early
+            stdscr.timeout(max(1, int(seconds * 1000) + 1))
+            if stdscr.getch() in (27, 113):
+                raise KeyboardInterrupt
+
+        for left in schedule.ticks(target, wait=wait_for_key):
+            if not left:
+                break
+            hours, minutes, seconds = schedule.split_seconds(left)
             stdscr.erase()
             stdscr.addstr('advent-cli', curses.color_pair(1))
             stdscr.addstr(' countdown\n\n')
@@ -452,16 +887,25 @@ def countdown(year, day):
             stdscr.addstr(f'  {hours} hours, {minutes} minutes, {seconds} seconds\n\n')
             stdscr.addstr('(press Q or CTRL+C to exit)', curses.color_pair(3))
             stdscr.refresh()
-            stdscr.nodelay(1)
-            key = stdscr.getch()
-            if key == 27 or key == 113:
-                raise KeyboardInterrupt
-            hours, minutes, seconds = get_time_until_unlock(year, day)
 
-    try:  # pragma: no cover
-        curses.wrapper(curses_countdown)
+    warm_up = None
+    if fetch:
+        # DNS and TLS out of the way shortly before unlock, in the background
+        warm_up = threading.Timer(max(target - time.monotonic() - unlock.WARM_UP_LEAD, 0),
+                                  client.warm_up)
+        warm_up.daemon = True
+        warm_up.start()
+
+    try:
+        if tui:  # pragma: no cover
+            curses.wrapper(curses_countdown)
+        else:
+            print_countdown(year, day, target)
         print(colored('Countdown finished', 'green'))
-        time.sleep(1)  # wait an extra second, just in case the timing is slightly early
-    except KeyboardInterrupt:  # pragma: no cover
+    except KeyboardInterrupt:
+        if warm_up is not None:
+            warm_up.cancel()
         print(colored('Countdown cancelled', 'red'))
         sys.exit(1)
+    if fetch:
+        fetch_at_unlock(year, day)
@@ -1,16 +1,38 @@
 import os
 import sys
 from termcolor import colored
+from types import MappingProxyType
+
+# global cap on requests per second, shared by every thread
+DEFAULT_RATE_LIMIT = 5
+
+# libraries solutions commonly use, the daemon imports whichever are installed
+DEFAULT_DAEMON_PRELOAD = ('numpy', 'networkx', 'sympy', 'scipy')
+
+_config = None
 
 
 def get_config():
+    # environment is read once per process, use reload_config() to pick up changes
+    global _config
+    if _config is None:
+        _config = MappingProxyType(load_config())
+    return _config
+
+
+def reload_config():
+    global _config
+    _config = None
+
+
+def load_config():
 
     config = {}
 
     if 'ADVENT_PRIV_BOARDS' in os.environ:
-        config['private_leaderboards'] = os.environ['ADVENT_PRIV_BOARDS'].split(',')
+        config['private_leaderboards'] = tuple(os.environ['ADVENT_PRIV_BOARDS'].split(','))
     else:
-        config['private_leaderboards'] = []
+        config['private_leaderboards'] = ()
 
     if 'ADVENT_DISABLE_TERMCOLOR' in os.environ:
         config['disable_color'] = (os.environ['ADVENT_DISABLE_TERMCOLOR'] == '1')
@@ -22,6 +44,30 @@ def get_config():
     else:
         config['md_em'] = 'default'
 
+    if 'ADVENT_CACHE_DIR' in os.environ:
+        config['cache_dir'] = os.environ['ADVENT_CACHE_DIR']
+    else:
+        config['cache_dir'] = os.path.join(
+            os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'advent-cli'
+        )
+
+    if 'ADVENT_CACHE_SIZE' in os.environ:
+        config['cache_max_size'] = int(os.environ['ADVENT_CACHE_SIZE']) * 1024 * 1024
+    else:
+        config['cache_max_size'] = 50 * 1024 * 1024
+
+    if 'ADVENT_DAEMON_PRELOAD' in os.environ:
+        config['daemon_preload'] = tuple(
+            name for name in os.environ['ADVENT_DAEMON_PRELOAD'].split(',') if name
+        )
+    else:
+        config['daemon_preload'] = DEFAULT_DAEMON_PRELOAD
+
+    if 'ADVENT_DAEMON_IDLE_TIMEOUT' in os.environ:
+        config['daemon_idle_timeout'] = int(os.environ['ADVENT_DAEMON_IDLE_TIMEOUT'])
+    else:
+        config['daemon_idle_timeout'] = 30
+
     if 'ADVENT_SESSION_COOKIE' in os.environ:
         config['session_cookie'] = os.environ['ADVENT_SESSION_COOKIE']
     else:
@@ -0,0 +1,124 @@
+import multiprocessing
+import signal
+import sys
+import time
+import traceback
+
+from dataclasses import dataclass
+from enum import Enum
+
+from .utils import compute_answers
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows, limits other than the timeout are skipped there
+    resource = None
+
+
+class RunStatus(Enum):
+    OK = 0
+    ERROR = 1
+    TIMEOUT = 2
+    OUT_OF_MEMORY = 3
+    CPU_LIMIT = 4
+    CRASHED = 5
+
+
+@dataclass
+class RunResult:
+    status: RunStatus
+    part1: object = None
+    part2: object = None
+    error: str = None
+    elapsed: float = 0.0
+    exitcode: int = None
+
+    @property
+    def answers(self):
+        return self.part1, self.part2
+
+
+def limit_resources(cpu_limit=None, memory_limit=None):
+    if resource is None:  # pragma: no cover
+        return
+    if cpu_limit is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_limit), hard))
+    if memory_limit is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (int(memory_limit), hard))
+
+
+def run_child(conn, year, day, file_path, solution_file, cpu_limit, memory_limit,
+              expected_part1=None):
+    # stream the solution's own output instead of holding it until exit
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=True)
+    try:
+        limit_resources(cpu_limit, memory_limit)
+        answers = compute_answers(year, day, file_path, solution_file=solution_file,
+                                  expected_part1=expected_part1)
+        try:
+            conn.send(('ok', answers))
+        except Exception:
+            conn.send(('ok', tuple(repr(answer) for answer in answers)))
+    except MemoryError:
+        conn.send(('oom', traceback.format_exc()))
+    except BaseException:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def status_from_exitcode(exitcode):
+    if exitcode == -getattr(signal, 'SIGXCPU', signal.SIGTERM):
+        return RunStatus.CPU_LIMIT
+    if exitcode == -getattr(signal, 'SIGKILL', signal.SIGTERM):
+        # killed by the kernel rather than by us, almost always the OOM killer
+        return RunStatus.OUT_OF_MEMORY
+    return RunStatus.CRASHED
+
+
+def run_isolated(year, day, file_path, solution_file='solution', timeout=None,
+                 cpu_limit=None, memory_limit=None, expected_part1=None):
+    recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=run_child,
+        args=(send_conn, year, day, file_path, solution_file, cpu_limit, memory_limit,
+              expected_part1),
+        daemon=True
+    )
+    sys.stdout.flush()
+    start = time.monotonic()
+    process.start()
+    send_conn.close()
+
+    message = None
+    # poll also returns when the child exits without sending anything
+    finished = recv_conn.poll(timeout)
+    if finished:
+        try:
+            message = recv_conn.recv()
+        except EOFError:
+            pass
+    elapsed = time.monotonic() - start
+    recv_conn.close()
+
+    if not finished:
+        process.kill()
+        process.join()
+        return RunResult(RunStatus.TIMEOUT, elapsed=elapsed, exitcode=process.exitcode)
+    process.join()
+
+    if message is None:
+        return RunResult(status_from_exitcode(process.exitcode), elapsed=elapsed,
+                         exitcode=process.exitcode)
+    kind, payload = message
+    if kind == 'ok':
+        return RunResult(RunStatus.OK, *payload, elapsed=elapsed, exitcode=process.exitcode)
+    if kind == 'oom':
+        return RunResult(RunStatus.OUT_OF_MEMORY, error=payload, elapsed=elapsed,
+                         exitcode=process.exitcode)
+    return RunResult(RunStatus.ERROR, error=payload, elapsed=elapsed,
+                     exitcode=process.exitcode)
@@ -0,0 +1,83 @@
+import pytz
+
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+
+
+@dataclass
+class Member:
+    id: int
+    name: str
+    local_score: int
+    stars: int
+    last_star_ts: int
+    # day -> number of stars collected (1 or 2)
+    completion: dict = field(default_factory=dict)
+
+    @property
+    def display_name(self):
+        return self.name if self.name else f'(anonymous user #{self.id})'
+
+
+@dataclass
+class Leaderboard:
+    event: str
+    owner_id: int
+    num_days: int
+    # sorted by rank
+    members: list
+
+    @property
+    def owner(self):
+        for member in self.members:
+            if member.id == self.owner_id:
+                return member.display_name
+        return f'(anonymous user #{self.owner_id})'
+
+
+def parse_member(data):
+    return Member(
+        id=int(data['id']),
+        name=data.get('name'),
+        local_score=int(data.get('local_score', 0)),
+        stars=int(data.get('stars', 0)),
+        last_star_ts=int(data.get('last_star_ts', 0)),
+        completion={
+            int(day): len(levels)
+            for day, levels in data.get('completion_day_level', {}).items()
+        }
+    )
+
+
+def parse_leaderboard(data):
+    members = [parse_member(m) for m in data['members'].values()]
+    members.sort(key=lambda m: (-m.local_score, m.last_star_ts, m.id))
+    return Leaderboard(
+        event=str(data['event']),
+        owner_id=int(data['owner_id']),
+        num_days=int(data.get('num_days', 25)),
+        members=members
+    )
+
+
+def get_positions(members):
+    # members sharing a score share a rank, only the first of them shows it
+    positions = []
+    previous_score = None
+    for rank, member in enumerate(members, start=1):
+        positions.append(rank if member.local_score != previous_score else None)
+        previous_score = member.local_score
+    return positions
+
+
+def count_unlocked_days(year, num_days=25):
+    est = pytz.timezone('EST')
+    now = dt.now(est)
+    return sum(1 for day in range(1, num_days + 1)
+               if est.localize(dt(int(year), 12, day)) <= now)
+
+
+def get_star_map(member, num_days, unlocked_days):
+    # stars per day, None for days that haven't unlocked yet
+    return [member.completion.get(day, 0) if day <= unlocked_days else None
+            for day in range(1, num_days + 1)]
@@ -0,0 +1,28 @@
+import markdownify
+
+
+class CustomMarkdownConverter(markdownify.MarkdownConverter):
+
+    def __init__(self, md_em, **options):
+        self.md_em = md_em
+        super().__init__(**options)
+
+    def convert_em(self, el, text, convert_as_inline):
+        if el.parent.name == 'code':
+            if self.md_em == 'ib':
+                return f'<i><b>{text}</b></i>'
+            elif self.md_em == 'mark':
+                return f'<mark>{text}</mark>'
+            elif self.md_em == 'none' or self.md_em == '':
+                return text
+        return super().convert_em(el, text, convert_as_inline)
+
+    def convert_code(self, el, text, convert_as_inline):
+        if self.md_em in ['ib', 'mark']:
+            return f'<code>{text}</code>'
+        return super().convert_code(el, text, convert_as_inline)
+
+    def convert_pre(self, el, text, convert_as_inline):
+        if self.md_em in ['ib', 'mark']:
+            return f'\n<pre>{text}</pre>\n'
+        return super().convert_pre(el, text, convert_as_inline)
@@ -0,0 +1,34 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:  # pragma: no cover
+    DEFAULT_PARSER = 'html.parser'
+
+# only build the parts of the tree we actually read
+ARTICLES = SoupStrainer('article')
+DAY_DESC = SoupStrainer('article', class_='day-desc')
+PARAGRAPHS = SoupStrainer('p')
+PRIVATE_BOARD_LINKS = SoupStrainer('a', href=re.compile(r'/leaderboard/private/view'))
+
+_MAIN_START = re.compile(r'<main[\s>]')
+
+
+def main_section(markup):
+    # everything we scrape lives inside <main>, skip the header and sidebar when possible
+    start = _MAIN_START.search(markup)
+    end = markup.rfind('</main>')
+    if start is None or end < start.start():
+        return markup
+    return markup[start.start():end + len('</main>')]
+
+
+def make_soup(markup, parse_only=None, parser=None):
+    return BeautifulSoup(markup, parser or DEFAULT_PARSER, parse_only=parse_only)
+
+
+def make_main_soup(markup, parse_only=None, parser=None):
+    return make_soup(main_section(markup), parse_only=parse_only, parser=parser)
@@ -0,0 +1,169 @@
+import cProfile
+import collections
+import os
+import pstats
+import sys
+import threading
+import time
+
+from .bench import STAGES, format_ns
+from .results import local_dependencies, solution_path
+from .utils import lazy_import, load_input, load_solution, share_data
+
+tabulate = lazy_import('tabulate')
+
+PROFILERS = ('cprofile', 'sampling')
+
+# how often the sampling profiler looks at the stack, in seconds
+SAMPLE_INTERVAL = 0.001
+
+
+class Sampler:
+    # statistical profiler, a thread records the profiled thread's stack every interval,
+    # slower but much less intrusive than cProfile for code with lots of tiny calls
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+        self._switch_interval = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def enable(self):
+        self._target = threading.get_ident()
+        # the sampler only runs when the GIL is handed over, so hand it over more often
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+
+def trim_stack(stack, own_files):
+    # drop the frames of advent-cli itself, the stack starts at the first solution frame;
+    # empty for samples taken outside the solution, e.g. while the sampler is stopped
+    for i, (filename, _, _) in enumerate(stack):
+        if filename in own_files:
+            return stack[i:]
+    return ()
+
+
+def frame_label(filename, lineno, name):
+    return f'{name} ({os.path.relpath(filename)}:{lineno})'
+
+
+def collapse(stacks, own_files):
+    # one "outer;inner;leaf count" line per stack, the input format of flamegraph tools
+    collapsed = collections.Counter()
+    for stack, count in stacks.items():
+        stack = trim_stack(stack, own_files)
+        if stack:
+            collapsed[';'.join(frame_label(*frame) for frame in stack)] += count
+    return ''.join(f'{line} {count}\n' for line, count in sorted(collapsed.items()))
+
+
+def hot_functions_sampled(stacks, own_files, elapsed):
+    # time spent in a solution function directly, or in library code it called,
+    # counts as its own; each sample is counted once per function for the total
+    total = sum(stacks.values()) or 1
+    own, cumulative = collections.Counter(), collections.Counter()
+    for stack, count in stacks.items():
+        frames = [frame for frame in stack if frame[0] in own_files]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            cumulative[frame] += count
+    return [
+        (frame, None, own[frame] / total * elapsed, cumulative[frame] / total * elapsed)
+        for frame in cumulative
+    ]
+
+
+def hot_functions_cprofile(profiler, own_files):
+    stats = pstats.Stats(profiler)
+    return [
+        ((filename, lineno, name), calls, own_time, total_time)
+        for (filename, lineno, name), (_, calls, own_time, total_time, _)
+        in stats.stats.items() if filename in own_files
+    ]
+
+
+def profile_call(func, args, profiler):
+    start = time.perf_counter_ns()
+    profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+    return result, time.perf_counter_ns() - start
+
+
+def profile(year, day, file_path, solution_file='solution', profiler='cprofile', top=15):
+    solution = load_solution(year, day, solution_file)
+    path = solution_path(year, day, solution_file)
+    own_files = {path, *local_dependencies(path, os.getcwd())}
+    raw_input = load_input(solution, file_path)
+
+    stages = {}
+    answers = []
+    data = None
+    for stage in STAGES:
+        active = cProfile.Profile() if profiler == 'cprofile' else Sampler()
+        if stage == 'parse':
+            data, elapsed = profile_call(solution.parse_input, (raw_input,), active)
+            data1, data2 = share_data(solution, data, lambda: load_input(solution, file_path))
+        else:
+            answer, elapsed = profile_call(getattr(solution, stage),
+                                           data1 if stage == 'part1' else data2, active)
+            answers.append(answer)
+        if profiler == 'cprofile':
+            functions = hot_functions_cprofile(active, own_files)
+        else:
+            functions = hot_functions_sampled(active.stacks, own_files, elapsed / 1e9)
+        functions.sort(key=lambda function: function[2], reverse=True)
+        stages[stage] = {'elapsed': elapsed, 'functions': functions[:top], 'profiler': active}
+    return tuple(answers), stages, own_files
+
+
+def write_profiles(year, day, solution_file, stages, own_files):
+    # next to the solution, .prof for snakeviz/pstats and collapsed stacks for flamegraph.pl,
+    # speedscope, inferno and the like
+    written = []
+    for stage, result in stages.items():
+        base = os.path.join(os.getcwd(), year, day, f'{solution_file}.{stage}')
+        active = result['profiler']
+        if isinstance(active, cProfile.Profile):
+            active.dump_stats(f'{base}.prof')
+            written.append(f'{base}.prof')
+        else:
+            with open(f'{base}.collapsed', 'w') as f:
+                f.write(collapse(active.stacks, own_files))
+            written.append(f'{base}.collapsed')
+    return written
+
+
+def format_table(functions):
+    rows = [
+        [frame_label(*frame), '-' if calls is None else calls,
+         format_ns(own_time * 1e9), format_ns(total_time * 1e9)]
+        for frame, calls, own_time, total_time in functions
+    ]
+    return tabulate.tabulate(rows, stralign='right',
+                             headers=['Function', 'Calls', 'Own time', 'Total time'])
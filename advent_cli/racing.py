@@ -0,0 +1,169 @@
+import json
+import multiprocessing
+import statistics
+import sys
+import traceback
+
+from .bench import STAGES, format_bytes, format_ns, run_stages
+from .isolation import RunStatus, status_from_exitcode
+from .utils import lazy_import, load_input, load_solution
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows, peak RSS is left out there
+    resource = None
+
+tabulate = lazy_import('tabulate')
+
+# speedups and answers are relative to this one
+BASELINE = 'solution'
+
+
+def peak_rss():
+    if resource is None:  # pragma: no cover
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def run_child(conn, year, day, file_path, solution_file, warmup):
+    try:
+        solution = load_solution(year, day, solution_file)
+        for _ in range(warmup):
+            run_stages(solution, lambda: load_input(solution, file_path))
+        answers, times = run_stages(solution, lambda: load_input(solution, file_path))
+        try:
+            conn.send(('ok', answers, times, peak_rss()))
+        except Exception:
+            conn.send(('ok', tuple(repr(answer) for answer in answers), times, peak_rss()))
+    except BaseException:
+        conn.send(('error', traceback.format_exc(), None, None))
+    finally:
+        conn.close()
+
+
+def run_once(year, day, file_path, solution_file, warmup=0, timeout=None):
+    # one timed run in a fresh process, so every run starts from the same state and the
+    # peak RSS is the variant's own; returns (RunStatus, answers or error, times, peak RSS)
+    recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=run_child, args=(send_conn, year, day, file_path, solution_file, warmup),
+        daemon=True
+    )
+    sys.stdout.flush()
+    process.start()
+    send_conn.close()
+
+    message = None
+    finished = recv_conn.poll(timeout)
+    if finished:
+        try:
+            message = recv_conn.recv()
+        except EOFError:
+            pass
+    recv_conn.close()
+    if not finished:
+        process.kill()
+    process.join()
+
+    if not finished:
+        return RunStatus.TIMEOUT, None, None, None
+    if message is None:
+        return status_from_exitcode(process.exitcode), None, None, None
+    kind, payload, times, rss = message
+    return (RunStatus.OK if kind == 'ok' else RunStatus.ERROR), payload, times, rss
+
+
+def summarize(variant, runs):
+    ok = [run for run in runs if run[0] == RunStatus.OK]
+    if len(ok) < len(runs):
+        status, error, _, _ = next(run for run in runs if run[0] != RunStatus.OK)
+        return {'variant': variant, 'status': status.name.lower(), 'error': error}
+    medians = {stage: statistics.median(run[2][i] for run in ok)
+               for i, stage in enumerate(STAGES)}
+    rss = [run[3] for run in ok if run[3] is not None]
+    return {
+        'variant': variant,
+        'status': 'ok',
+        'answers': ok[-1][1],
+        'runs': len(ok),
+        'median': medians,
+        'total': sum(medians.values()),
+        'peak_rss': max(rss) if rss else None,
+    }
+
+
+def answers_agree(answers, reference):
+    return all(str(answer) == str(expected) for answer, expected in zip(answers, reference))
+
+
+def rank(results, baseline):
+    # fastest first by total median time, but variants with different answers than the
+    # baseline go after the ones that agree, and failed variants last in the order given
+    reference = next((result for result in results
+                      if result['variant'] == baseline and result['status'] == 'ok'), None)
+    for result in results:
+        if result['status'] == 'ok' and reference is not None:
+            result['speedup'] = reference['total'] / result['total'] \
+                if result['total'] else None
+            result['agrees'] = answers_agree(result['answers'], reference['answers'])
+        else:
+            result['speedup'] = result['agrees'] = None
+    return sorted(results, key=lambda result: (result['status'] != 'ok',
+                                               result['agrees'] is False,
+                                               result.get('total', 0)))
+
+
+def race(year, day, file_path, variants, runs=5, warmup=0, timeout=None, baseline=BASELINE):
+    runs = max(runs, 1)
+    samples = {variant: [] for variant in variants}
+    for _ in range(runs):
+        # interleaved, so anything else slowing the machine down hits every variant alike
+        for variant in variants:
+            previous = samples[variant]
+            if previous and previous[-1][0] != RunStatus.OK:
+                continue
+            previous.append(run_once(year, day, file_path, variant, warmup=warmup,
+                                     timeout=timeout))
+    results = rank([summarize(variant, samples[variant]) for variant in variants], baseline)
+    return {
+        'year': year,
+        'day': day,
+        'input': file_path,
+        'baseline': baseline,
+        'runs': runs,
+        'warmup': warmup,
+        'results': results,
+    }
+
+
+def format_table(race_result):
+    rows = []
+    position = 0
+    for result in race_result['results']:
+        name = f'{result["variant"]}.py'
+        if result['status'] != 'ok':
+            rows.append(['-', name, None, None, None, None, None, None, result['status']])
+            continue
+        position += 1
+        if result['agrees'] is None:
+            agrees = None
+        else:
+            agrees = 'same' if result['agrees'] else 'different'
+        rows.append([
+            position, name, *(format_ns(result['median'][stage]) for stage in STAGES),
+            format_ns(result['total']),
+            format_bytes(result['peak_rss']) if result['peak_rss'] is not None else None,
+            f'{result["speedup"]:.2f}x' if result['speedup'] is not None else None,
+            agrees
+        ])
+    return tabulate.tabulate(rows, stralign='right', missingval='-', headers=[
+        'Rank', 'Variant', *STAGES, 'Total', 'Peak RSS',
+        f'vs {race_result["baseline"]}.py', 'Answers'
+    ])
+
+
+def format_json(race_result):
+    return json.dumps(race_result, indent=2, default=str)
@@ -0,0 +1,43 @@
+import sys
+
+from itertools import groupby
+
+from .utils import colored, colored_repeat
+
+STAR_COLORS = {2: 'yellow', 1: 'cyan', 0: 'grey'}
+
+
+class Buffer:
+    # collects print() output and writes it to stdout in one go
+
+    def __init__(self):
+        self.parts = []
+
+    def print(self, *values, sep=' ', end='\n'):
+        self.parts.append(sep.join(str(value) for value in values) + end)
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+    def flush(self):
+        sys.stdout.write(self.getvalue())
+        sys.stdout.flush()
+        self.parts = []
+
+
+def render_stars(levels):
+    # levels holds the number of stars per day, None for days that are still locked
+    runs = []
+    for level, group in groupby(levels):
+        count = sum(1 for _ in group)
+        if level is None:
+            runs.append(' ' * count)
+        else:
+            runs.append(colored_repeat('*', STAR_COLORS[level], count))
+    return ''.join(runs)
+
+
+def render_star_legend():
+    return (f'({colored("*", "yellow")} 2 stars) '
+            f'({colored("*", "cyan")} 1 star) '
+            f'({colored("*", "grey")} 0 stars)')
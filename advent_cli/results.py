@@ -0,0 +1,284 @@
+import ast
+import hashlib
+import io
+import os
+import pickle
+import sys
+import time
+
+from . import config
+from .cache import evict_lru
+from .utils import compute_answers, data_sharing, load_input, load_solution, share_data
+
+STAGE_FUNCTIONS = {'parse': 'parse_input', 'part1': 'part1', 'part2': 'part2'}
+
+_use_cache = True
+
+
+def configure_cache(enabled=True):
+    global _use_cache
+    _use_cache = enabled
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def solution_path(year, day, solution_file='solution'):
+    return os.path.join(os.getcwd(), year, day, f'{solution_file}.py')
+
+
+def module_file(root, name):
+    base = os.path.join(root, *name.split('.'))
+    for candidate in (f'{base}.py', os.path.join(base, '__init__.py')):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def imported_names(path, root):
+    # every dotted name the file could be importing, relative imports resolved against root
+    with open(path, 'rb') as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except (SyntaxError, ValueError):
+            return
+    package = os.path.relpath(os.path.dirname(path), root).split(os.sep)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            prefixes = [alias.name.split('.') for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = package[:len(package) - node.level + 1] if node.level else []
+            module = base + (node.module.split('.') if node.module else [])
+            # "from pkg import name" may import a submodule or just an attribute
+            prefixes = [module] + [module + [alias.name] for alias in node.names]
+        else:
+            continue
+        for parts in prefixes:
+            for i in range(1, len(parts) + 1):
+                yield '.'.join(parts[:i])
+
+
+def local_dependencies(path, root):
+    # files under root that the solution imports, directly or through each other
+    seen = {os.path.abspath(path)}
+    pending = [path]
+    while pending:
+        for name in imported_names(pending.pop(), root):
+            dependency = module_file(root, name)
+            if dependency is not None and os.path.abspath(dependency) not in seen:
+                seen.add(os.path.abspath(dependency))
+                pending.append(dependency)
+    seen.discard(os.path.abspath(path))
+    return sorted(seen)
+
+
+def hash_dependencies(digest, path, root):
+    for dependency in local_dependencies(path, root):
+        digest.update(f'{os.path.relpath(dependency, root)}:{hash_file(dependency)}'.encode())
+
+
+def result_key(year, day, file_path, solution_file='solution'):
+    # content addressed, editing the solution, anything local it imports, the input or
+    # switching interpreters gives a different key so stale entries are never hit
+    root = os.getcwd()
+    path = solution_path(year, day, solution_file)
+    digest = hashlib.sha256(sys.version.encode())
+    digest.update(hash_file(path).encode())
+    hash_dependencies(digest, path, root)
+    digest.update(hash_file(file_path).encode())
+    return digest.hexdigest()
+
+
+class LimitedBuffer(io.BytesIO):
+    # gives up as soon as more than limit bytes are written, so pickling an entry that
+    # won't fit in the cache stops early instead of serializing all of it first
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def write(self, data):
+        if self.tell() + len(data) > self.limit:
+            raise ValueError('entry is larger than the cache')
+        return super().write(data)
+
+
+class ResultCache:
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pickle')
+
+    def load(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                entry = pickle.load(f)
+            # mark as recently used for eviction
+            os.utime(self._path(key))
+            return entry
+        except Exception:
+            # missing, truncated or written by an incompatible version, just recompute
+            return None
+
+    def store(self, key, answers, elapsed):
+        return self.write(key, {'answers': tuple(answers), 'elapsed': elapsed,
+                                'time': time.time()})
+
+    def write(self, key, entry):
+        # returns the entry, or None if it can't be pickled or wouldn't fit in the cache at all
+        buffer = LimitedBuffer(self.max_size)
+        try:
+            pickle.Pickler(buffer).dump(entry)
+        except Exception:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{self._path(key)}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getbuffer())
+        os.replace(tmp_path, self._path(key))
+        evict_lru(self.directory, self.max_size, '.pickle')
+        return entry
+
+
+def get_result_cache():
+    conf = config.get_config()
+    return ResultCache(os.path.join(conf['cache_dir'], 'results'), conf['cache_max_size'])
+
+
+def lookup(year, day, file_path, solution_file='solution'):
+    # returns the key to store a fresh result under and the cached entry if there is one,
+    # the key is None when caching is off or the files can't be read
+    if not _use_cache:
+        return None, None
+    try:
+        key = result_key(year, day, file_path, solution_file)
+    except OSError:
+        return None, None
+    return key, get_result_cache().load(key)
+
+
+def store(key, answers, elapsed):
+    if key is not None:
+        get_result_cache().store(key, answers, elapsed)
+
+
+def reference_answers(year, day, file_path, solution_file='solution'):
+    # returns the answers and whether they came from the cache
+    key, entry = lookup(year, day, file_path, solution_file)
+    if entry is not None:
+        return entry['answers'], True
+    start = time.monotonic()
+    answers = compute_answers(year, day, file_path, solution_file=solution_file)
+    store(key, answers, time.monotonic() - start)
+    return answers, False
+
+
+def stage_sources(path):
+    # splits the solution into the source of each stage function and everything else,
+    # module level code and helpers can affect any stage so they go into every key
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    lines = source.splitlines(keepends=True)
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError):
+        return source, {}
+    functions = {}
+    removed = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) \
+                and node.name in STAGE_FUNCTIONS.values():
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            names = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+            functions[node.name] = (''.join(lines[start - 1:node.end_lineno]), names)
+            removed.update(range(start - 1, node.end_lineno))
+    context = ''.join(line for i, line in enumerate(lines) if i not in removed)
+    sources = {}
+    for name, (function_source, names) in functions.items():
+        # a stage calling another stage depends on that one's source too
+        sources[name] = function_source + ''.join(
+            functions[other][0] for other in sorted(names & functions.keys()) if other != name
+        )
+    return context, sources
+
+
+def stage_keys(year, day, file_path, solution_file='solution'):
+    # returns {stage: key}, or None when caching is off or the files can't be read;
+    # each part is keyed on the parse key, so a new input or parse_input misses everything
+    if not _use_cache:
+        return None
+    root = os.getcwd()
+    path = solution_path(year, day, solution_file)
+    try:
+        context, sources = stage_sources(path)
+        base = hashlib.sha256(sys.version.encode())
+        base.update(context.encode())
+        hash_dependencies(base, path, root)
+        base.update(hash_file(file_path).encode())
+    except OSError:
+        return None
+
+    def chain(parent, stage):
+        source = sources.get(STAGE_FUNCTIONS[stage], '')
+        return hashlib.sha256(f'{parent}:{stage}:{source}'.encode()).hexdigest()
+
+    parse_key = chain(base.hexdigest(), 'parse')
+    return {'parse': parse_key, 'part1': chain(parse_key, 'part1'),
+            'part2': chain(parse_key, 'part2')}
+
+
+def compute_stages(year, day, file_path, keys, solution_file='solution', expected_part1=None):
+    # like compute_answers but only runs the stages whose key isn't cached,
+    # returns the answers and the names of the stages that were reused
+    result_cache = get_result_cache()
+    solution = load_solution(year, day, solution_file)
+    hits = []
+    ran = []
+    split = []
+
+    def parsed_data():
+        if not split:
+            entry = result_cache.load(keys['parse'])
+            if entry is not None:
+                hits.append('parse')
+                data = entry['data']
+            else:
+                start = time.monotonic()
+                data = solution.parse_input(load_input(solution, file_path))
+                # generators and the like can't be pickled, they are parsed again next time
+                result_cache.write(keys['parse'], {'data': data, 'time': time.time(),
+                                                   'elapsed': time.monotonic() - start})
+            split.extend(share_data(solution, data, lambda: load_input(solution, file_path)))
+            split.append(data_sharing(solution, data))
+        return split
+
+    def run_part(part):
+        stage = f'part{part}'
+        entry = result_cache.load(keys[stage])
+        if entry is not None:
+            hits.append(stage)
+            return entry['answer']
+        data1, data2, policy = parsed_data()
+        if part == 2 and 1 not in ran and policy in ('copy', 'shared'):
+            # part2 may depend on what part1 did to the objects they share, so part1
+            # runs again even though its answer was cached
+            solution.part1(*data1)
+        start = time.monotonic()
+        answer = getattr(solution, stage)(*(data1, data2)[part - 1])
+        ran.append(part)
+        result_cache.write(keys[stage], {'answer': answer, 'time': time.time(),
+                                         'elapsed': time.monotonic() - start})
+        return answer
+
+    answers = (run_part(1), None)
+    if expected_part1 is None or str(answers[0]).strip() == expected_part1:
+        answers = (answers[0], run_part(2))
+    return answers, sorted(hits, key=list(STAGE_FUNCTIONS).index)
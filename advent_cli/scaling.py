@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+import math
+import os
+import statistics
+import tempfile
+
+from .bench import STAGES, format_ns, run_stages
+from .utils import lazy_import, load_input, load_solution
+
+tabulate = lazy_import('tabulate')
+
+# the input is halved this many times, the largest prefix is half of the real input
+DEFAULT_STEPS = 5
+
+DEFAULT_SIZES = (125, 250, 500, 1000, 2000)
+
+# candidate curves for the fit, in order of growth
+COMPLEXITIES = {
+    'O(1)': lambda n: 1.0,
+    'O(log n)': lambda n: max(math.log2(n), 1.0),
+    'O(n)': lambda n: float(n),
+    'O(n log n)': lambda n: n * max(math.log2(n), 1.0),
+    'O(n²)': lambda n: float(n) ** 2,
+    'O(n³)': lambda n: float(n) ** 3,
+}
+
+
+def input_size(data):
+    # lines for normal inputs, characters for single line ones (e.g. one long string)
+    lines = data.splitlines(keepends=True)
+    if len(lines) > 1:
+        return 'lines', len(lines)
+    return 'chars', len(data.rstrip(b'\r\n'))
+
+
+def prefix_inputs(data, steps=DEFAULT_STEPS):
+    # returns the unit and [(size, prefix bytes)], smallest first
+    unit, total = input_size(data)
+    if unit == 'lines':
+        lines = data.splitlines(keepends=True)
+
+        def prefix(size):
+            return b''.join(lines[:size])
+    else:
+        text = data.rstrip(b'\r\n')
+
+        def prefix(size):
+            return text[:size] + b'\n'
+
+    sizes = sorted({total // 2 ** step for step in range(steps, 0, -1)} - {0})
+    return unit, [(size, prefix(size)) for size in sizes]
+
+
+def generated_inputs(generator, sizes=DEFAULT_SIZES):
+    inputs = []
+    for size in sorted(sizes):
+        data = generator.generate_input(size)
+        inputs.append((size, data.encode() if isinstance(data, str) else data))
+    return inputs
+
+
+def measure(solution, inputs, runs=5, warmup=1):
+    # best of several runs for every input, a size the solution can't handle is recorded
+    # with its exception and left out of the fit
+    samples = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'input.txt')
+        for size, data in inputs:
+            with open(path, 'wb') as f:
+                f.write(data)
+            sample = {'size': size, 'bytes': len(data)}
+            try:
+                for _ in range(warmup):
+                    run_stages(solution, lambda: load_input(solution, path))
+                best = None
+                for _ in range(max(runs, 1)):
+                    _, times = run_stages(solution, lambda: load_input(solution, path))
+                    best = times if best is None else tuple(map(min, best, times))
+                sample.update(zip(STAGES, best))
+            except Exception as e:
+                sample['error'] = f'{type(e).__name__}: {e}'
+            samples.append(sample)
+    return samples
+
+
+def fit_complexity(points, full_size=None):
+    # least squares in log space, t = a * f(n) for each candidate f, and a power law
+    # t = a * n^k for the exponent; returns None without two distinct sizes to go on
+    points = [(size, ns) for size, ns in points if size > 0 and ns > 0]
+    if len({size for size, _ in points}) < 2:
+        return None
+    log_sizes = [math.log(size) for size, _ in points]
+    log_times = [math.log(ns) for _, ns in points]
+    mean_size, mean_time = statistics.fmean(log_sizes), statistics.fmean(log_times)
+    exponent = sum((x - mean_size) * (y - mean_time) for x, y in zip(log_sizes, log_times)) \
+        / sum((x - mean_size) ** 2 for x in log_sizes)
+
+    best = None
+    for name, curve in COMPLEXITIES.items():
+        residuals = [log_time - math.log(curve(size))
+                     for (size, _), log_time in zip(points, log_times)]
+        scale = statistics.fmean(residuals)
+        error = statistics.fmean((residual - scale) ** 2 for residual in residuals)
+        if best is None or error < best[0]:
+            best = error, name, scale
+    _, name, scale = best
+
+    fit = {'exponent': exponent, 'complexity': name, 'projected': None}
+    if full_size:
+        fit['projected'] = math.exp(scale) * COMPLEXITIES[name](full_size)
+    return fit
+
+
+def scale(year, day, file_path, solution_file='solution', steps=DEFAULT_STEPS, runs=5,
+          warmup=1, generator=None, sizes=None, full_size=None):
+    solution = load_solution(year, day, solution_file)
+    data = None
+    if os.path.exists(file_path):
+        with open(file_path, 'rb') as f:
+            data = f.read()
+
+    if generator is not None:
+        unit = 'size'
+        # generated sizes are in the generator's own unit, so there's nothing to project
+        # at unless it's given
+        inputs = generated_inputs(load_solution(year, day, generator),
+                                  sizes or DEFAULT_SIZES)
+    else:
+        unit, inputs = prefix_inputs(data, steps)
+        if full_size is None:
+            full_size = input_size(data)[1]
+
+    samples = measure(solution, inputs, runs=runs, warmup=warmup)
+    fits = {
+        stage: fit_complexity([(sample['size'], sample[stage])
+                               for sample in samples if 'error' not in sample], full_size)
+        for stage in STAGES
+    }
+    return {
+        'year': year,
+        'day': day,
+        'solution': solution_file,
+        'input': file_path,
+        'source': 'generator' if generator is not None else 'prefix',
+        'unit': unit,
+        'runs': max(runs, 1),
+        'full_size': full_size,
+        'samples': samples,
+        'fits': fits,
+    }
+
+
+def format_table(result):
+    rows = [
+        [sample['size'], sample['bytes']]
+        + ([format_ns(sample[stage]) for stage in STAGES] if 'error' not in sample
+           else [sample['error'], None, None])
+        for sample in result['samples']
+    ]
+    return tabulate.tabulate(rows, stralign='right', missingval='-',
+                             headers=[result['unit'].capitalize(), 'Bytes', *STAGES])
+
+
+def format_fit_table(result):
+    # without a size to project at, there's no projection column at all
+    full_size = result['full_size']
+    rows = []
+    for stage, fit in result['fits'].items():
+        if fit is None:
+            row = [stage, None, None, None]
+        else:
+            row = [stage, fit['complexity'], fit['exponent'],
+                   format_ns(fit['projected']) if fit['projected'] is not None else None]
+        rows.append(row if full_size else row[:3])
+    headers = ['Stage', 'Best fit', 'Exponent']
+    if full_size and result['unit'] == 'size':
+        headers.append(f'At size {full_size}')
+    elif full_size:
+        headers.append(f'At {full_size} {result["unit"]}')
+    return tabulate.tabulate(rows, stralign='right', missingval='-', floatfmt='.2f',
+                             headers=headers)
+
+
+def format_csv(result):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['size', 'bytes', *(f'{stage}_ns' for stage in STAGES), 'error'])
+    for sample in result['samples']:
+        times = [sample.get(stage, '') for stage in STAGES]
+        writer.writerow([sample['size'], sample['bytes'], *times, sample.get('error', '')])
+    return output.getvalue()
+
+
+def format_json(result):
+    return json.dumps(result, indent=2, default=str)
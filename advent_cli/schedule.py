@@ -0,0 +1,37 @@
+import time
+
+from math import ceil
+
+
+def deadline(timestamp):
+    # the wall clock is read once, after that everything runs on the monotonic clock so
+    # clock adjustments can't make the countdown skip or repeat seconds
+    return time.monotonic() + timestamp - time.time()
+
+
+def sleep_until(target, wait=None):
+    # wait(seconds) may return early (e.g. on a key press), so check again until it's time
+    while True:
+        remaining = target - time.monotonic()
+        if remaining <= 0:
+            return
+        (wait or time.sleep)(remaining)
+
+
+def ticks(target, step=1, wait=None):
+    # yields the seconds left, rounded up to a whole step, as soon as that changes and 0 at
+    # the target, sleeping in between instead of polling
+    while True:
+        remaining = target - time.monotonic()
+        if remaining <= 0:
+            yield 0
+            return
+        shown = ceil(remaining / step) * step
+        yield shown
+        sleep_until(target - (shown - step), wait)
+
+
+def split_seconds(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return hours, minutes, seconds
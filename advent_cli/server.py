@@ -0,0 +1,387 @@
+import importlib
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import time
+import traceback
+
+from datetime import datetime as dt
+
+from . import config
+from ._version import __version__
+
+# set for commands run by the daemon, so they don't try to forward themselves again
+WORKER_ENV = 'ADVENT_DAEMON_WORKER'
+
+# advent-cli itself and what test and submit would otherwise import on every run
+WARM_MODULES = (
+    'advent_cli.cli', 'advent_cli.commands', 'advent_cli.batch', 'advent_cli.client',
+    'advent_cli.isolation', 'advent_cli.results', 'requests', 'tabulate',
+)
+
+# kind and length of every message from the daemon
+FRAME = struct.Struct('!cI')
+OUTPUT = b'o'
+EXIT = b'x'
+REPLY = b'j'
+
+SUPPORTED = hasattr(os, 'fork') and hasattr(socket, 'AF_UNIX')
+
+
+def socket_path():
+    return os.path.join(config.get_config()['cache_dir'], 'daemon.sock')
+
+
+def log_path():
+    return os.path.join(config.get_config()['cache_dir'], 'daemon.log')
+
+
+def send_frame(conn, kind, payload):
+    conn.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+
+def read_frames(conn):
+    stream = conn.makefile('rb')
+    while True:
+        header = stream.read(FRAME.size)
+        if len(header) < FRAME.size:
+            return
+        kind, length = FRAME.unpack(header)
+        yield kind, stream.read(length)
+
+
+def connect(timeout=None):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(socket_path())
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def request(message, timeout=5):
+    # returns the daemon's reply, or None when it isn't running
+    if not SUPPORTED:
+        return None
+    try:
+        conn = connect(timeout)
+    except OSError:
+        return None
+    with conn:
+        conn.sendall(json.dumps(message).encode() + b'\n')
+        for kind, payload in read_frames(conn):
+            if kind == REPLY:
+                return json.loads(payload)
+    return None
+
+
+def status():
+    return request({'command': 'status'})
+
+
+def stop(timeout=5):
+    # returns whether a daemon was running, waits for it to remove its socket
+    if request({'command': 'stop'}) is None:
+        return False
+    deadline = time.monotonic() + timeout
+    while os.path.exists(socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def start(idle_timeout, preload, timeout=30):
+    # returns the pid once the daemon answers, or None if it exited first
+    os.makedirs(config.get_config()['cache_dir'], exist_ok=True)
+    with open(log_path(), 'ab') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'advent_cli', 'daemon', 'run',
+             '--idle-timeout', str(idle_timeout), '--preload', ','.join(preload)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return None
+        info = status()
+        if info is not None:
+            return info['pid']
+        time.sleep(0.05)
+    return None
+
+
+def run_request(argv):
+    # everything the worker needs to run the command as if it had been started here
+    return {
+        'command': 'run', 'version': __version__, 'executable': sys.executable,
+        'cwd': os.getcwd(), 'path': sys.path, 'argv': argv, 'env': dict(os.environ),
+        'tty': sys.stdout.isatty(),
+    }
+
+
+def forward(argv):
+    # runs the command in the daemon and returns its exit code, or None to run it here
+    # because no daemon is running or it's a different version of advent-cli
+    if not SUPPORTED or os.environ.get(WORKER_ENV):
+        return None
+    try:
+        conn = connect()
+    except OSError:
+        return None
+    with conn:
+        conn.sendall(json.dumps(run_request(argv)).encode() + b'\n')
+        try:
+            for kind, payload in read_frames(conn):
+                if kind == OUTPUT:
+                    sys.stdout.buffer.write(payload)
+                    sys.stdout.flush()
+                elif kind == EXIT:
+                    return int(payload)
+                else:
+                    reply = json.loads(payload)
+                    print(f'(The daemon runs advent-cli {reply.get("version")} with '
+                          f'{reply.get("executable")}, restart it to use it with '
+                          f'{__version__} with {sys.executable})', file=sys.stderr)
+                    return None
+        except KeyboardInterrupt:
+            # the connection going away makes the daemon kill the run
+            conn.shutdown(socket.SHUT_RDWR)
+            return 130
+    return None
+
+
+def log(message):
+    print(f'[{dt.now():%Y-%m-%d %H:%M:%S}] {message}', flush=True)
+
+
+def exit_code(wait_status):
+    if os.WIFEXITED(wait_status):
+        return os.WEXITSTATUS(wait_status)
+    return 128 + os.WTERMSIG(wait_status)
+
+
+def run_worker(request, output_fd):
+    # in the forked child, runs the command as if "advent" had been started in the
+    # client's directory and environment, with the output going back through the pipe
+    code = 1
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # own process group, so the daemon can kill anything the run starts as well
+        os.setpgid(0, 0)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+        os.dup2(output_fd, 1)
+        os.dup2(output_fd, 2)
+        # nothing else from the daemon, other clients' connections included
+        os.closerange(3, os.sysconf('SC_OPEN_MAX'))
+        # new streams on the redirected descriptors, whatever sys.stdout was before
+        sys.stdout = open(1, 'w', encoding='utf-8', buffering=1, closefd=False)
+        sys.stderr = open(2, 'w', encoding='utf-8', buffering=1, closefd=False)
+        os.chdir(request['cwd'])
+        # the client's import path rather than the daemon's, whose first entry is the
+        # directory it was started in, so solutions come from the client's project
+        sys.path[:] = [request['cwd'], *(path for path in request['path']
+                                         if path not in ('', request['cwd']))]
+        importlib.invalidate_caches()
+        os.environ.clear()
+        os.environ.update(request['env'])
+        os.environ[WORKER_ENV] = '1'
+        if request.get('tty'):
+            os.environ.setdefault('FORCE_COLOR', '1')
+        sys.argv = ['advent', *request['argv']]
+        config.reload_config()
+        from . import cli
+        cli.main()
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+class Run:
+
+    def __init__(self, conn, pid, output):
+        self.conn = conn
+        self.pid = pid
+        self.output = output
+
+
+class Daemon:
+
+    def __init__(self, path, idle_timeout, preload=()):
+        # idle_timeout in seconds, 0 to keep running until stopped
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.preload = tuple(preload)
+        self.preloaded = []
+        self.selector = selectors.DefaultSelector()
+        self.listener = None
+        self.runs = {}
+        self.served = 0
+        self.started = time.time()
+        self.last_active = time.monotonic()
+        self.running = True
+
+    def warm_up(self):
+        # everything imported here is shared with every run through fork
+        for name in WARM_MODULES + self.preload:
+            try:
+                # lazily imported modules only load on attribute access
+                dir(importlib.import_module(name))
+            except Exception:
+                continue
+            if name in self.preload:
+                self.preloaded.append(name)
+
+    def info(self):
+        return {
+            'pid': os.getpid(),
+            'version': __version__,
+            'python': sys.version.split()[0],
+            'socket': self.path,
+            'started': self.started,
+            'served': self.served,
+            'running': len(self.runs),
+            'preloaded': self.preloaded,
+            'idle_timeout': self.idle_timeout,
+        }
+
+    def listen(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            # left behind by a daemon that was killed
+            os.remove(self.path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # only this user may connect, runs get the client's environment and session cookie
+        umask = os.umask(0o177)
+        try:
+            self.listener.bind(self.path)
+        finally:
+            os.umask(umask)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept)
+
+    def serve(self):
+        self.warm_up()
+        self.listen()
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        log(f'Listening on {self.path} (pid {os.getpid()}, '
+            f'preloaded {", ".join(self.preloaded) or "nothing"})')
+        try:
+            while self.running:
+                timeout = None
+                if self.idle_timeout and not self.runs:
+                    timeout = self.last_active + self.idle_timeout - time.monotonic()
+                    if timeout <= 0:
+                        log('Idle, shutting down')
+                        break
+                for key, _ in self.selector.select(timeout):
+                    key.data(key.fileobj)
+        finally:
+            for run in list(self.runs.values()):
+                self.finish(run, kill=True)
+            self.selector.close()
+            self.listener.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            log('Stopped')
+
+    def stop(self):
+        self.running = False
+
+    def accept(self, listener):
+        try:
+            conn, _ = listener.accept()
+        except BlockingIOError:
+            return
+        self.last_active = time.monotonic()
+        try:
+            conn.settimeout(5)
+            message = json.loads(conn.makefile('rb').readline())
+            command = message['command']
+        except Exception:
+            conn.close()
+            return
+        # a different advent-cli or interpreter could behave differently, the client runs
+        # the command itself then
+        if command == 'run' and message.get('version') == __version__ \
+                and message.get('executable') == sys.executable:
+            self.start_run(conn, message)
+            return
+        if command == 'status':
+            reply = self.info()
+        elif command == 'stop':
+            reply = {'stopping': True}
+            self.stop()
+        else:
+            reply = {'error': 'unsupported', 'version': __version__,
+                     'executable': sys.executable}
+        try:
+            send_frame(conn, REPLY, json.dumps(reply).encode())
+        except OSError:
+            pass
+        conn.close()
+
+    def start_run(self, conn, message):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            run_worker(message, write_fd)
+        os.close(write_fd)
+        try:
+            # the child does this too, whichever runs first
+            os.setpgid(pid, pid)
+        except OSError:
+            pass
+        conn.settimeout(None)
+        run = Run(conn, pid, read_fd)
+        self.runs[read_fd] = run
+        self.selector.register(read_fd, selectors.EVENT_READ, lambda _: self.relay(run))
+        # the client never sends anything else, so readable means it went away (CTRL+C)
+        self.selector.register(conn, selectors.EVENT_READ,
+                               lambda _: self.finish(run, kill=True))
+
+    def relay(self, run):
+        data = os.read(run.output, 64 * 1024)
+        if not data:
+            self.finish(run)
+            return
+        try:
+            send_frame(run.conn, OUTPUT, data)
+        except OSError:
+            self.finish(run, kill=True)
+
+    def finish(self, run, kill=False):
+        if kill:
+            try:
+                os.killpg(run.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        _, wait_status = os.waitpid(run.pid, 0)
+        if not kill:
+            try:
+                send_frame(run.conn, EXIT, str(exit_code(wait_status)).encode())
+            except OSError:
+                pass
+        self.selector.unregister(run.output)
+        self.selector.unregister(run.conn)
+        os.close(run.output)
+        run.conn.close()
+        del self.runs[run.output]
+        self.served += 1
+        self.last_active = time.monotonic()
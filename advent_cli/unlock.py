@@ -0,0 +1,58 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import client
+from .utils import get_unlock_time
+
+# seconds before unlock to open the connections, well within the server's keep-alive
+WARM_UP_LEAD = 10
+
+# delay before retrying a puzzle that isn't unlocked yet, doubled after every attempt
+RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 1.0
+
+# requests per URL that skip the rate limiter, the first attempt and the first retry,
+# later retries are spaced out by it as usual
+BURST = 2
+
+# give up this many seconds after unlock, the local clock is probably way off
+GIVE_UP_AFTER = 60
+
+
+def is_locked(r):
+    return r.status_code == 404 and 'before it unlocks' in r.text
+
+
+def seconds_until_unlock(year, day):
+    return get_unlock_time(year, day).timestamp() - time.time()
+
+
+def wait_for_unlock(year, day):
+    remaining = seconds_until_unlock(year, day)
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+def fetch_when_unlocked(url, deadline):
+    # the server's clock decides, so a few early requests are expected
+    delay = RETRY_DELAY
+    attempt = 0
+    while True:
+        r = client.get(url, refresh=True, burst=attempt < BURST)
+        if not is_locked(r) or time.monotonic() + delay > deadline:
+            return r
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_RETRY_DELAY)
+        attempt += 1
+
+
+def fetch_puzzle_day(year, day, timeout=GIVE_UP_AFTER):
+    # prompt and input at the same time, unlike commands.fetch_puzzle_day which only
+    # asks for the input once the prompt says the session cookie works
+    deadline = time.monotonic() + timeout
+    url = f'{client.BASE_URL}/{year}/day/{int(day)}'
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        prompt, r_input = executor.map(lambda url: fetch_when_unlocked(url, deadline),
+                                       [url, f'{url}/input'])
+    return prompt, r_input
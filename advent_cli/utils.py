@@ -1,24 +1,72 @@
 import argparse
-import markdownify
+import importlib.util
+import inspect
+import mmap
 import os
+import pickle
 import re as re
-import requests
 import sys
-import pytz
+import threading
+import time
+import types
+import typing
 
 from datetime import datetime as dt
 from enum import Enum
 from gettext import gettext
 from importlib import import_module
-from math import ceil
 from itertools import tee
-from copy import copy
-from collections.abc import Generator
+from copy import copy, deepcopy
+from collections.abc import Generator, Iterable, Iterator
 from termcolor import colored as tc_colored
 
 from . import config
 
 
+_lazy_lock = threading.RLock()
+_lazy_loading = set()
+
+
+class LazyModule(types.ModuleType):
+    # executes the module on first attribute access; unlike importlib's LazyLoader before
+    # Python 3.12, other threads wait for that to finish instead of seeing it half loaded
+
+    def __getattribute__(self, attr):
+        if type(self) is LazyModule:
+            with _lazy_lock:
+                # the loading thread itself gets through while the module runs
+                if type(self) is LazyModule and id(self) not in _lazy_loading:
+                    _lazy_loading.add(id(self))
+                    try:
+                        spec = types.ModuleType.__getattribute__(self, '__spec__')
+                        spec.loader.exec_module(self)
+                        self.__class__ = types.ModuleType
+                    finally:
+                        _lazy_loading.discard(id(self))
+        return types.ModuleType.__getattribute__(self, attr)
+
+
+def lazy_import(name):
+    # the module is only executed on first attribute access, so commands that never
+    # touch the network or the terminal don't pay for importing what they'd need to
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    module = importlib.util.module_from_spec(spec)
+    module.__class__ = LazyModule
+    sys.modules[name] = module
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+client = lazy_import('advent_cli.client')
+markdown = lazy_import('advent_cli.markdown')
+multiprocessing = lazy_import('multiprocessing')
+pytz = lazy_import('pytz')
+
+
 class Status(Enum):
     PASS = 0
     FAIL = 1
@@ -28,6 +76,14 @@ class Status(Enum):
     UNKNOWN = 5
 
 
+class PartTimeout(Exception):
+
+    def __init__(self, part, timeout):
+        super().__init__(f'Part {part} timed out after {timeout} seconds')
+        self.part = part
+        self.timeout = timeout
+
+
 def colored(text, color):
     if config.get_config()['disable_color']:
         if text == '*':
@@ -40,32 +96,193 @@ def colored(text, color):
         return tc_colored(text, color)
 
 
-def compute_answers(year, day, file_path, solution_file='solution'):
-    sys.path.append(os.getcwd())
-    solution = import_module(f'{year}.{day}.{solution_file}')
+def colored_repeat(text, color, count):
+    # one escape sequence around the whole run instead of one per repetition
+    if config.get_config()['disable_color']:
+        return colored(text, color) * count
+    return tc_colored(text * count, color)
+
+
+def load_solution(year, day, solution_file='solution'):
+    if os.getcwd() not in sys.path:
+        sys.path.append(os.getcwd())
+    return import_module(f'{year}.{day}.{solution_file}')
+
+
+INPUT_MODES = ('lines', 'iter', 'text', 'bytes', 'mmap', 'memoryview')
+
+# parse_input annotation -> input mode, anything else gets the list of lines
+ANNOTATED_MODES = {
+    str: 'text',
+    bytes: 'bytes',
+    mmap.mmap: 'mmap',
+    memoryview: 'memoryview',
+    Iterator: 'iter',
+    Iterable: 'iter',
+    Generator: 'iter',
+}
+
+
+def read_input(file_path):
     with open(file_path, 'r') as f:
-        data = solution.parse_input([
-            line.replace('\r', '').replace('\n', '') for line in f.readlines()
-        ])
-    if isinstance(data, Generator):
+        return [line.replace('\r', '').replace('\n', '') for line in f]
+
+
+def iter_input(file_path):
+    # same lines as read_input, one at a time, the file stays open until exhausted
+    with open(file_path, 'r') as f:
+        for line in f:
+            yield line.replace('\r', '').replace('\n', '')
+
+
+def map_input(file_path):
+    with open(file_path, 'rb') as f:
+        try:
+            # the mapping outlives the file object, it's unmapped once unreferenced
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            return b''
+
+
+def input_mode(solution):
+    # an INPUT_MODE module attribute wins over the parse_input annotation
+    mode = vars(solution).get('INPUT_MODE')
+    if mode is None:
+        try:
+            parse_input = solution.parse_input
+            hints = typing.get_type_hints(parse_input)
+            first = next(iter(inspect.signature(parse_input).parameters))
+        except Exception:
+            return 'lines'
+        hint = hints.get(first)
+        return ANNOTATED_MODES.get(typing.get_origin(hint) or hint, 'lines')
+    if mode not in INPUT_MODES:
+        raise ValueError(f'Unknown INPUT_MODE {mode!r}, '
+                         f'expected one of {", ".join(INPUT_MODES)}')
+    return mode
+
+
+def load_input(solution, file_path):
+    mode = input_mode(solution)
+    if mode == 'iter':
+        return iter_input(file_path)
+    if mode == 'text':
+        with open(file_path, 'r') as f:
+            return f.read()
+    if mode == 'bytes':
+        with open(file_path, 'rb') as f:
+            return f.read()
+    if mode == 'mmap':
+        return map_input(file_path)
+    if mode == 'memoryview':
+        return memoryview(map_input(file_path))
+    return read_input(file_path)
+
+
+DATA_SHARING_POLICIES = ('copy', 'deepcopy', 'reparse', 'shared')
+
+
+def data_sharing(solution, data):
+    # a DATA_SHARING module attribute wins, otherwise generators are parsed again
+    # (tee would buffer the whole stream while part1 consumes it) and the rest is copied
+    policy = vars(solution).get('DATA_SHARING')
+    if policy is None:
+        return 'reparse' if isinstance(data, Generator) else 'copy'
+    if policy not in DATA_SHARING_POLICIES:
+        raise ValueError(f'Unknown DATA_SHARING {policy!r}, '
+                         f'expected one of {", ".join(DATA_SHARING_POLICIES)}')
+    return policy
+
+
+def as_args(data):
+    # parse_input returning a tuple means several arguments to the parts
+    return data if isinstance(data, tuple) else (data,)
+
+
+def split_data(data, policy='copy', reparse=None):
+    # independent arguments for part1 and part2, so part1 can't consume or change
+    # part2's input, except with "shared" where both get the same objects
+    if policy == 'reparse' and reparse is not None:
+        data1, data2 = data, reparse()
+    elif policy == 'deepcopy':
+        data1, data2 = data, deepcopy(data)
+    elif policy == 'shared':
+        data1 = data2 = data
+    elif isinstance(data, Generator):
         data1, data2 = tee(data)
+    elif isinstance(data, tuple):
+        # copying the tuple itself would still share every argument in it
+        data1, data2 = tuple(map(copy, data)), tuple(map(copy, data))
     else:
         data1, data2 = copy(data), copy(data)
-    if not isinstance(data, tuple):
-        data1 = (data1,)
-        data2 = (data2,)
+    return as_args(data1), as_args(data2)
+
+
+def share_data(solution, data, make_input):
+    # split_data with the solution's policy, make_input gives a fresh input to parse again
+    return split_data(data, data_sharing(solution, data),
+                      lambda: solution.parse_input(make_input()))
+
+
+def compute_answers(year, day, file_path, solution_file='solution', expected_part1=None):
+    # with expected_part1, part2 is only run if part1 produced that answer
+    solution = load_solution(year, day, solution_file)
+    data = solution.parse_input(load_input(solution, file_path))
+    data1, data2 = share_data(solution, data, lambda: load_input(solution, file_path))
     part1_answer = solution.part1(*data1)
+    if expected_part1 is not None and str(part1_answer).strip() != expected_part1:
+        return part1_answer, None
     part2_answer = solution.part2(*data2)
     return part1_answer, part2_answer
 
 
+def run_part(year, day, solution_file, part, data, file_path):
+    # runs in a worker process, data is pickled part arguments or None to parse again here,
+    # either way nothing is shared with the other part so there is nothing to copy
+    solution = load_solution(year, day, solution_file)
+    if data is None:
+        args = as_args(solution.parse_input(load_input(solution, file_path)))
+    else:
+        args = pickle.loads(data)
+    return getattr(solution, f'part{part}')(*args)
+
+
+def compute_answers_parallel(year, day, file_path, solution_file='solution', timeout=None):
+    solution = load_solution(year, day, solution_file)
+    data = solution.parse_input(load_input(solution, file_path))
+    payload = None
+    if data_sharing(solution, data) != 'reparse':
+        try:
+            # each worker unpickles its own copy, so one payload does for both parts
+            payload = pickle.dumps(as_args(data))
+        except Exception:
+            # generators and the like can't be shipped, the workers re-parse instead
+            pass
+    payloads = [payload, payload]
+
+    with multiprocessing.Pool(2) as pool:
+        start = time.monotonic()
+        results = [
+            pool.apply_async(run_part, (year, day, solution_file, part, payload, file_path))
+            for part, payload in enumerate(payloads, start=1)
+        ]
+        answers = []
+        for part, result in enumerate(results, start=1):
+            # both parts started together, so each deadline counts from the start
+            remaining = None
+            if timeout is not None:
+                remaining = max(timeout - (time.monotonic() - start), 0)
+            try:
+                answers.append(result.get(remaining))
+            except multiprocessing.TimeoutError:
+                raise PartTimeout(part, timeout)
+    return tuple(answers)
+
+
 def submit_answer(year, day, level, answer):
     payload = {'level': level, 'answer': answer}
-    r = requests.post(
-        f'https://adventofcode.com/{year}/day/{int(day)}/answer',
-        data=payload,
-        cookies={'session': config.get_config()['session_cookie']}
-    )
+    r = client.post(f'https://adventofcode.com/{year}/day/{int(day)}/answer', data=payload)
     response = r.text
     if "That's the right answer" in response:
         return Status.PASS, None
@@ -81,13 +298,8 @@ def submit_answer(year, day, level, answer):
         return Status.UNKNOWN, response
 
 
-def get_time_until_unlock(year, day):
-    est = pytz.timezone('EST')
-    unlock_time = est.localize(dt(int(year), 12, int(day)))
-    delta = ceil((unlock_time - dt.now().astimezone(est)).total_seconds())
-    minutes, seconds = divmod(delta, 60)
-    hours, minutes = divmod(minutes, 60)
-    return hours, minutes, seconds
+def get_unlock_time(year, day):
+    return pytz.timezone('EST').localize(dt(int(year), 12, int(day)))
 
 
 # class to override default argparse formatter, because I don't think it looks very nice
@@ -120,32 +332,6 @@ class CustomHelpFormatter(argparse.RawTextHelpFormatter):
                              super()._format_action(action)))
 
 
-class CustomMarkdownConverter(markdownify.MarkdownConverter):
-
-    def __init__(self, md_em, **options):
-        self.md_em = md_em
-        super().__init__(**options)
-
-    def convert_em(self, el, text, convert_as_inline):
-        if el.parent.name == 'code':
-            if self.md_em == 'ib':
-                return f'<i><b>{text}</b></i>'
-            elif self.md_em == 'mark':
-                return f'<mark>{text}</mark>'
-            elif self.md_em == 'none' or self.md_em == '':
-                return text
-        return super().convert_em(el, text, convert_as_inline)
-
-    def convert_code(self, el, text, convert_as_inline):
-        if self.md_em in ['ib', 'mark']:
-            return f'<code>{text}</code>'
-        return super().convert_code(el, text, convert_as_inline)
-
-    def convert_pre(self, el, text, convert_as_inline):
-        if self.md_em in ['ib', 'mark']:
-            return f'\n<pre>{text}</pre>\n'
-        return super().convert_pre(el, text, convert_as_inline)
-
-
 def custom_markdownify(html, **options):
-    return CustomMarkdownConverter(config.get_config()['md_em'], **options).convert(html)
+    md_em = config.get_config()['md_em']
+    return markdown.CustomMarkdownConverter(md_em, **options).convert(html)
@@ -0,0 +1,60 @@
+import json
+import os
+
+from enum import Enum
+
+
+class Verdict(Enum):
+    PASS = 'pass'
+    FAIL = 'fail'
+    MISSING = 'missing'
+    SKIPPED = 'skipped'
+
+
+def read_expected(year, day):
+    # accepted answers written by "advent get solution", None where there isn't one
+    expected = []
+    for part in (1, 2):
+        try:
+            with open(os.path.join(os.getcwd(), year, day, f'solution{part}.txt'), 'r') as f:
+                expected.append(f.read().strip())
+        except OSError:
+            expected.append(None)
+    return tuple(expected)
+
+
+def check_answer(answer, expected):
+    if expected is None:
+        return Verdict.MISSING
+    if answer is not None and str(answer).strip() == expected:
+        return Verdict.PASS
+    return Verdict.FAIL
+
+
+def verify_answers(answers, expected, fail_fast=False):
+    part1_verdict = check_answer(answers[0], expected[0])
+    if fail_fast and part1_verdict == Verdict.FAIL:
+        return part1_verdict, Verdict.SKIPPED
+    return part1_verdict, check_answer(answers[1], expected[1])
+
+
+def passed(verdicts):
+    return Verdict.FAIL not in verdicts
+
+
+def to_record(year, day, answers, expected, verdicts, **extra):
+    return {
+        'year': year,
+        'day': day,
+        **extra,
+        'parts': [
+            {'part': part, 'answer': answer, 'expected': expected_answer,
+             'verdict': verdict.value}
+            for part, answer, expected_answer, verdict
+            in zip((1, 2), answers, expected, verdicts)
+        ],
+    }
+
+
+def format_json(records):
+    return json.dumps(records, indent=2, default=str)
@@ -0,0 +1,269 @@
+import ctypes
+import ctypes.util
+import importlib
+import importlib.util
+import multiprocessing
+import os
+import select
+import signal
+import struct
+import sys
+import time
+import traceback
+
+from datetime import datetime as dt
+
+from .bench import format_ns, run_stages
+from .results import local_dependencies, solution_path
+from .utils import colored, load_input, load_solution
+
+# wait this long after a change for the rest of an editor's writes before re-running
+DEBOUNCE = 0.05
+
+# stat interval when inotify isn't available
+POLL_INTERVAL = 0.2
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+# whole directories are watched, editors often save by writing a new file and renaming it
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.directories = {}
+        self.paths = set()
+
+    def watch(self, paths):
+        self.paths = {os.path.abspath(path) for path in paths}
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            if directory not in self.directories.values():
+                wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+                if wd >= 0:
+                    self.directories[wd] = directory
+
+    def _read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        buffer = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            wd, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if wd in self.directories:
+                path = os.path.join(self.directories[wd], os.fsdecode(name))
+                if path in self.paths:
+                    changed.add(path)
+        return changed
+
+    def wait(self, timeout=None):
+        # blocks until a watched file changes, returns every path changed in the burst
+        changed = self._read(timeout)
+        while changed:
+            more = self._read(DEBOUNCE)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+
+    def __init__(self, interval=POLL_INTERVAL):
+        self.interval = interval
+        self.signatures = {}
+
+    def _signature(self, path):
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def watch(self, paths):
+        self.signatures = {
+            path: self.signatures.get(path, self._signature(path))
+            for path in map(os.path.abspath, paths)
+        }
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(self.interval)
+            changed = {path for path, signature in self.signatures.items()
+                       if self._signature(path) != signature}
+            if changed:
+                time.sleep(DEBOUNCE)
+                for path in self.signatures:
+                    self.signatures[path] = self._signature(path)
+                return changed
+        return set()
+
+    def close(self):
+        pass
+
+
+def make_watcher():
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError, TypeError):
+        # not Linux, or no inotify in this libc
+        return PollingWatcher()
+
+
+def _module_path(module):
+    # straight from the namespace, getattr would execute modules that are still lazy
+    path = object.__getattribute__(module, '__dict__').get('__file__')
+    return os.path.abspath(path) if isinstance(path, str) else None
+
+
+def reload_changed(paths):
+    # reload every imported module whose file changed and return them, modules are added to
+    # sys.modules before their own imports run, so going backwards reloads dependencies first
+    changed = {os.path.abspath(path) for path in paths}
+    modules = [module for module in reversed(list(sys.modules.values()))
+               if _module_path(module) in changed]
+    for module in modules:
+        try:
+            # bytecode is validated by whole-second mtime and size, a quick edit that keeps
+            # the size would otherwise reload the old code
+            os.remove(importlib.util.cache_from_source(module.__file__))
+        except (OSError, ValueError, NotImplementedError):
+            pass
+        importlib.reload(module)
+    return modules
+
+
+def run_worker(conn, year, day, file_path, solution_file):
+    # long-lived child, keeps everything imported between runs and only reloads what changed
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.dont_write_bytecode = True
+    solution = None
+    while True:
+        try:
+            changed = conn.recv()
+        except EOFError:
+            return
+        try:
+            if solution is None:
+                solution = load_solution(year, day, solution_file)
+            elif changed:
+                reloaded = reload_changed(changed)
+                if reloaded and solution not in reloaded:
+                    # names imported from a reloaded helper are only rebound by this
+                    importlib.reload(solution)
+            answers, times = run_stages(solution, lambda: load_input(solution, file_path))
+            try:
+                conn.send(('ok', answers, times))
+            except Exception:
+                conn.send(('ok', tuple(repr(answer) for answer in answers), times))
+        except BaseException:
+            conn.send(('error', traceback.format_exc(), None))
+
+
+class Worker:
+
+    def __init__(self, year, day, file_path, solution_file):
+        self.args = (year, day, file_path, solution_file)
+        self.process = None
+        self.conn = None
+
+    def start(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=run_worker,
+                                               args=(child_conn, *self.args), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+
+    def run(self, changed, timeout=None):
+        # returns ('ok', answers, times), ('error', traceback, None), ('timeout', None, None)
+        # or ('crashed', exitcode, None); the worker is restarted after a timeout or crash
+        if self.process is None:
+            self.start()
+            changed = []
+        self.conn.send(list(changed))
+        if not self.conn.poll(timeout):
+            self.stop()
+            return 'timeout', None, None
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.process.join()
+            exitcode = self.process.exitcode
+            self.stop()
+            return 'crashed', exitcode, None
+
+
+def watched_paths(year, day, file_path, solution_file):
+    path = solution_path(year, day, solution_file)
+    return [path, file_path] + local_dependencies(path, os.getcwd())
+
+
+def report(kind, payload, times, timeout):
+    if kind == 'ok':
+        part1_answer, part2_answer = payload
+        print(f'{colored("Part 1:", "cyan")} {part1_answer}')
+        if part2_answer is not None:
+            print(f'{colored("Part 2:", "yellow")} {part2_answer}')
+        print(colored(' | '.join(f'{stage} {format_ns(ns)}'
+                                 for stage, ns in zip(('parse', 'part1', 'part2'), times)),
+                      'grey'))
+    elif kind == 'error':
+        print(colored('Solution raised an exception:', 'red'))
+        print(payload, end='')
+    elif kind == 'timeout':
+        print(colored(f'Solution timed out after {timeout} seconds', 'red'))
+    else:
+        print(colored(f'Solution process exited with code {payload}', 'red'))
+
+
+def watch(year, day, file_path, solution_file='solution', timeout=None):
+    watcher = make_watcher()
+    worker = Worker(year, day, file_path, solution_file)
+    kind = 'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'
+    print(colored(f'Watching {solution_file}.py and {os.path.basename(file_path)} '
+                  f'({kind}, press CTRL+C to exit)', 'grey'))
+    changed = []
+    try:
+        while True:
+            watcher.watch(watched_paths(year, day, file_path, solution_file))
+            start = time.monotonic()
+            report(*worker.run(changed, timeout), timeout)
+            print(colored(f'[{dt.now():%H:%M:%S}] done in '
+                          f'{format_ns((time.monotonic() - start) * 1e9)}', 'grey'))
+            sys.stdout.flush()
+            changed = watcher.wait()
+            while not changed:
+                changed = watcher.wait()
+            names = ', '.join(sorted(os.path.relpath(path) for path in changed))
+            print(f'\n{colored(f"Changed: {names}", "magenta")}')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+        watcher.close()
@@ -1,11 +1,54 @@
 import os
 import pytest
+import sys
 from mock import patch
 
+from advent_cli import config, results
+
+# a working solution for tests that run one, the answers to '1\n2\n3\n' are 6 and 3
+SOLUTION = '''
+def parse_input(lines):
+    return [int(x) for x in lines]
+
+
+def part1(data):
+    return sum(data)
+
+
+def part2(data):
+    return max(data)
+'''
+
 
 @pytest.fixture(autouse=True)
-def env_patch_fixture():
+def env_patch_fixture(tmp_path):
     with patch.dict(os.environ, {'ADVENT_SESSION_COOKIE': '',
                                  'ADVENT_PRIV_BOARDS': '1111111',
-                                 'ADVENT_DISABLE_TERMCOLOR': '1'}):
+                                 'ADVENT_DISABLE_TERMCOLOR': '1',
+                                 'ADVENT_CACHE_DIR': str(tmp_path / 'cache')}):
+        config.reload_config()
+        results.configure_cache()
         yield
+    config.reload_config()
+
+
+@pytest.fixture
+def make_day(tmp_path, monkeypatch):
+    # make_day(year, day) writes YYYY/DD/solution.py and input.txt in a fresh working
+    # directory and returns the day directory, solutions imported from it are forgotten after
+    monkeypatch.chdir(tmp_path)
+    # load_solution adds the working directory to the import path
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+
+    def make_day(year, day='01', solution=SOLUTION, input_text='1\n2\n3\n'):
+        day_dir = tmp_path / year / day
+        day_dir.mkdir(parents=True)
+        (day_dir / 'solution.py').write_text(solution)
+        (day_dir / 'input.txt').write_text(input_text)
+        return day_dir
+
+    yield make_day
+    # everything importable from the working directory, the years and any helper modules
+    local = {os.path.splitext(name)[0] for name in os.listdir(tmp_path)}
+    for name in [name for name in sys.modules if name.split('.')[0] in local]:
+        del sys.modules[name]
@@ -0,0 +1,55 @@
+# micro-benchmark for the HTML parser backends on the saved fixture pages
+# run from the repository root with: PYTHONPATH=. python tests/bench_parsers.py [-n NUMBER]
+import argparse
+import os
+import timeit
+
+from tabulate import tabulate
+
+from advent_cli import parsing
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), '_fixtures', 'pages')
+
+# (page, what is extracted, strainer used by the command that scrapes it)
+CASES = [
+    ('day.html', 'prompt', parsing.DAY_DESC),
+    ('day.html', 'answers', parsing.PARAGRAPHS),
+    ('leaderboard_self.html', 'stats', parsing.ARTICLES),
+    ('private_board.html', 'board', None),
+]
+
+
+def available_parsers():
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+
+def bench(number):
+    rows = []
+    for page, extracted, strainer in CASES:
+        with open(os.path.join(PAGES_DIR, page), 'r', encoding='utf-8') as f:
+            markup = f.read()
+        label = f'{page} ({extracted})'
+        for parser in available_parsers():
+            full = timeit.timeit(lambda: parsing.make_soup(markup, parser=parser),
+                                 number=number) / number
+            targeted = timeit.timeit(
+                lambda: parsing.make_main_soup(markup, parse_only=strainer, parser=parser),
+                number=number
+            ) / number
+            rows.append([label, parser, f'{full * 1000:.2f}', f'{targeted * 1000:.2f}',
+                         f'{full / targeted:.1f}x'])
+    return rows
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('-n', '--number', type=int, default=20)
+    args = arg_parser.parse_args()
+    print(tabulate(bench(args.number),
+                   headers=['page', 'parser', 'full (ms)', 'targeted (ms)', 'speedup']))
@@ -0,0 +1,76 @@
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import batch, commands
+from advent_cli.isolation import RunResult, RunStatus
+from advent_cli.verify import Verdict
+
+
+def test_parse_day_range():
+    assert batch.parse_day_range(None) == (1, 25)
+    assert batch.parse_day_range('05') == (5, 5)
+    assert batch.parse_day_range('01-10') == (1, 10)
+
+
+def test_find_days(tmp_path, monkeypatch):
+    for day in ['01', '02', '10', '11', 'notes']:
+        (tmp_path / '2099' / day).mkdir(parents=True)
+        if day != '02':
+            (tmp_path / '2099' / day / 'solution.py').touch()
+    monkeypatch.chdir(tmp_path)
+    assert batch.find_days('2099') == ['01', '10', '11']
+    assert batch.find_days('2099', 2, 10) == ['10']
+    assert batch.find_days('2098') == []
+
+
+@patch('advent_cli.batch.run_isolated')
+def test_run_batch(mock_run_isolated):
+    mock_run_isolated.side_effect = lambda year, day, path, **kwargs: RunResult(
+        RunStatus.OK, int(day), None, elapsed=1 / int(day)
+    )
+    results = batch.run_batch('2099', ['01', '02', '03'], jobs=2, timeout=5)
+    assert [(day, result.part1, verdicts) for day, result, verdicts in results] == \
+        [('01', 1, None), ('02', 2, None), ('03', 3, None)]
+    assert mock_run_isolated.call_args.kwargs == \
+        {'solution_file': 'solution', 'timeout': 5, 'expected_part1': None}
+    assert batch.count_failures(results) == 0
+
+    results.append(('04', RunResult(RunStatus.TIMEOUT, elapsed=5), None))
+    assert batch.count_failures(results) == 1
+    summary = batch.format_summary(results, sort='time').splitlines()
+    assert [line.split()[0] for line in summary[2:]] == ['04', '01', '02', '03']
+    assert summary[2].split()[-1] == 'timeout'
+
+
+@patch('advent_cli.commands.batch.run_batch')
+@patch('advent_cli.commands.batch.find_days', return_value=['01', '02'])
+def test_test_year(mock_find_days, mock_run_batch, capsys):
+    mock_run_batch.return_value = [
+        ('01', RunResult(RunStatus.OK, 5, 10, elapsed=0.5), None),
+        ('02', RunResult(RunStatus.ERROR, error='Traceback\nValueError: bad input\n'), None),
+    ]
+    assert not commands.test_year('2099', '01-02', jobs=4)
+    mock_find_days.assert_called_once_with('2099', 1, 2, solution_file='solution')
+    captured_stdout = capsys.readouterr().out
+    assert '2099/02: ValueError: bad input\n' in captured_stdout
+    assert captured_stdout.endswith('1 of 2 day(s) failed\n')
+
+
+@patch('advent_cli.batch.read_expected', return_value=('1', '5'))
+@patch('advent_cli.batch.run_isolated')
+def test_run_batch_verify(mock_run_isolated, mock_read_expected):
+    mock_run_isolated.side_effect = lambda year, day, path, **kwargs: RunResult(
+        RunStatus.OK, int(day), 5, elapsed=0.1
+    )
+    results = batch.run_batch('2099', ['01', '02'], verify=True, fail_fast=True)
+    assert mock_run_isolated.call_args.kwargs['expected_part1'] == '1'
+    assert [verdicts for _, _, verdicts in results] == [
+        (Verdict.PASS, Verdict.PASS), (Verdict.FAIL, Verdict.SKIPPED)
+    ]
+    assert batch.count_failures(results) == 1
+    summary = batch.format_summary(results).splitlines()
+    assert summary[0].split()[-4:] == ['Check', '1', 'Check', '2']
+    assert summary[3].split()[-2:] == ['fail', 'skipped']
+    records = batch.to_records('2099', results)
+    assert records[1]['parts'][0] == {'part': 1, 'answer': 2, 'expected': '1',
+                                      'verdict': 'fail'}
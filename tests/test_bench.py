@@ -0,0 +1,40 @@
+import json
+from mock import patch, MagicMock
+from _fixtures import env_patch_fixture
+
+from advent_cli import bench
+
+
+def make_solution():
+    solution = MagicMock()
+    solution.parse_input.side_effect = lambda lines: [int(x) for x in lines]
+    solution.part1.side_effect = lambda data: sum(data)
+    solution.part2.side_effect = lambda data: max(data)
+    return solution
+
+
+@patch('advent_cli.bench.read_input', return_value=['1', '2', '3'])
+@patch('advent_cli.bench.load_solution')
+def test_benchmark(mock_load, mock_read):
+    mock_load.return_value = make_solution()
+    result = bench.benchmark('2099', '99', 'input.txt', runs=3, warmup=2)
+    mock_load.assert_called_once_with('2099', '99', 'solution')
+    # 2 warmup + 3 timed + 1 traced run + 2 to measure the fan-out
+    assert mock_load.return_value.parse_input.call_count == 8
+    assert result['answers'] == {'part1': 6, 'part2': 3}
+    assert list(result['stages']) == ['parse', 'part1', 'part2']
+    for stats in result['stages'].values():
+        assert 0 <= stats['min'] <= stats['median']
+        assert stats['peak_memory'] >= 0
+    assert result['fan_out']['policy'] == 'copy' and result['fan_out']['peak_memory'] > 0
+    assert json.loads(bench.format_json(result))['runs'] == 3
+
+
+def test_format():
+    assert bench.format_ns(1500) == '1.50 µs'
+    assert bench.format_ns(2_500_000_000) == '2.50 s'
+    assert bench.format_bytes(2048) == '2.0 KiB'
+    table = bench.format_table({'stages': {
+        'parse': {'min': 1000, 'median': 2000, 'stdev': 0, 'peak_memory': 10}
+    }})
+    assert 'parse' in table and '2.00 µs' in table and '10 B' in table
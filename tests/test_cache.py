@@ -0,0 +1,59 @@
+import math
+import os
+from mock import patch, MagicMock
+
+from advent_cli import cache
+
+
+def test_get_ttl():
+    assert cache.get_ttl('https://adventofcode.com/2099/day/1/input') == math.inf
+    assert cache.get_ttl('https://adventofcode.com/2099/day/1') == 300
+    assert cache.get_ttl('https://adventofcode.com/2099/leaderboard/private/view/1.json') \
+        == 900
+    assert cache.get_ttl('https://adventofcode.com/2099/day/1/answer') == 0
+
+
+def test_cache_store_load(tmp_path):
+    response_cache = cache.ResponseCache(str(tmp_path), 1024)
+    key = response_cache.key('https://adventofcode.com/2099/day/1', 'cookie')
+    assert key != response_cache.key('https://adventofcode.com/2099/day/1', 'other')
+    assert response_cache.load(key) is None
+
+    response_cache.store(key, MagicMock(url='https://adventofcode.com/2099/day/1',
+                                        status_code=200, text='prompt',
+                                        headers={'Last-Modified': 'yesterday'}))
+    entry = response_cache.load(key)
+    assert response_cache.is_fresh(entry, 300)
+    assert cache.conditional_headers(entry) == {'If-Modified-Since': 'yesterday'}
+    assert cache.to_response(entry).text == 'prompt'
+
+    with patch('time.time', return_value=entry['time'] + 301):
+        assert not response_cache.is_fresh(entry, 300)
+
+    response_cache.invalidate(key)
+    assert response_cache.load(key) is None
+
+
+def test_cache_evict(tmp_path):
+    response_cache = cache.ResponseCache(str(tmp_path), 400)
+    for i in range(5):
+        with patch('time.time', return_value=1000 + i):
+            response_cache.store(str(i), MagicMock(url=str(i), status_code=200,
+                                                   text='x' * 100, headers={}))
+    remaining = sorted(p.name for p in tmp_path.iterdir())
+    assert len(remaining) < 5
+    assert '4.json' in remaining
+    assert '0.json' not in remaining
+
+
+def test_cache_evict_least_recently_used(tmp_path):
+    response_cache = cache.ResponseCache(str(tmp_path), 10 ** 6)
+    for i in range(3):
+        response_cache.store(str(i), MagicMock(url=str(i), status_code=200,
+                                               text='x' * 100, headers={}))
+        os.utime(tmp_path / f'{i}.json', (1000 + i, 1000 + i))
+    # "0" was written first but just read, "1" is the least recently used now
+    assert response_cache.load('0')['url'] == '0'
+    response_cache.max_size = 2 * os.path.getsize(tmp_path / '0.json') + 10
+    response_cache.evict()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['0.json', '2.json']
@@ -1,16 +1,22 @@
+import pytest
 from mock import patch
 from _fixtures import env_patch_fixture
 
 from advent_cli import cli
 
 
+@patch('advent_cli.cli.client.set_rate_limit')
 @patch('advent_cli.cli.commands.get')
 @patch('argparse.ArgumentParser')
-def test_cli_get(mock_argparse, mock_command_get):
+def test_cli_get(mock_argparse, mock_command_get, mock_set_rate_limit):
     mock_argparse.return_value.parse_args.return_value.date = '2099/99'
     mock_argparse.return_value.parse_args.return_value.command = 'get'
+    mock_argparse.return_value.parse_args.return_value.subcommand = 'puzzle'
+    mock_argparse.return_value.parse_args.return_value.jobs = 4
+    mock_argparse.return_value.parse_args.return_value.rate = None
     cli.main()
-    mock_command_get.assert_called_once_with('2099', '99')
+    mock_command_get.assert_called_once_with('2099', '99', jobs=4)
+    mock_set_rate_limit.assert_called_once_with(None)
 
 
 @patch('advent_cli.cli.commands.stats')
@@ -45,14 +51,108 @@ def test_cli_test(mock_argparse, mock_command_test):
                                               example=False)
 
 
+@patch('advent_cli.cli.commands.test_year', return_value=True)
+@patch('argparse.ArgumentParser')
+def test_cli_test_year(mock_argparse, mock_command_test_year):
+    args = mock_argparse.return_value.parse_args.return_value
+    args.command = 'test'
+    args.date = '2099/01-05'
+    args.no_daemon = True
+    # the defaults, None for flags that take a value
+    for dest in cli.SINGLE_DAY_FLAGS:
+        unset = None if dest in ('cpu_limit', 'memory_limit', 'profiler') else False
+        setattr(args, dest, unset)
+    parser_error = mock_argparse.return_value.add_subparsers.return_value.add_parser \
+        .return_value.error
+    with pytest.raises(SystemExit) as e:
+        cli.main()
+    assert e.value.code == 0
+    parser_error.assert_not_called()
+    mock_command_test_year.assert_called_once()
+
+    args.memory_limit, args.isolate = 512, True
+    parser_error.side_effect = SystemExit(2)
+    with pytest.raises(SystemExit):
+        cli.main()
+    parser_error.assert_called_once_with('--isolate, --memory-limit only work when testing '
+                                         'a single day')
+    assert mock_command_test_year.call_count == 1
+
+
 @patch('advent_cli.cli.commands.submit')
 @patch('argparse.ArgumentParser')
 def test_cli_submit(mock_argparse, mock_command_submit):
     mock_argparse.return_value.parse_args.return_value.date = '2099/99'
     mock_argparse.return_value.parse_args.return_value.command = 'submit'
     mock_argparse.return_value.parse_args.return_value.solution_file = 'solution'
+    mock_argparse.return_value.parse_args.return_value.isolate = True
+    mock_argparse.return_value.parse_args.return_value.timeout = 10.0
+    mock_argparse.return_value.parse_args.return_value.cpu_limit = None
+    mock_argparse.return_value.parse_args.return_value.memory_limit = 512
+    cli.main()
+    mock_command_submit.assert_called_once_with('2099', '99', solution_file='solution',
+                                                isolate=True, timeout=10.0, cpu_limit=None,
+                                                memory_limit=512 * 1024 * 1024)
+
+
+@patch('advent_cli.cli.commands.bench')
+@patch('argparse.ArgumentParser')
+def test_cli_bench(mock_argparse, mock_command_bench):
+    args = mock_argparse.return_value.parse_args.return_value
+    args.date = '2099/99'
+    args.command = 'bench'
+    args.solution_file = 'solution'
+    args.input_file = 'input.txt'
+    args.runs, args.warmup, args.steps = 3, 1, 4
+    args.scale = True
+    args.generator = args.sizes = args.full_size = args.csv_file = args.json_file = None
+    cli.main()
+    mock_command_bench.assert_called_once_with('2099', '99', solution_file='solution',
+                                               input_file='input.txt', runs=3, warmup=1,
+                                               json_file=None, scale=True, steps=4,
+                                               generator=None, sizes=None, full_size=None,
+                                               csv_file=None)
+
+
+@patch('advent_cli.cli.commands.race')
+@patch('argparse.ArgumentParser')
+def test_cli_race(mock_argparse, mock_command_race):
+    args = mock_argparse.return_value.parse_args.return_value
+    args.date = '2099/99'
+    args.command = 'race'
+    args.variants = ['solution2', 'solution3']
+    args.input_file = 'input.txt'
+    args.runs, args.warmup, args.timeout, args.json_file = 3, 0, 10.0, None
+    cli.main()
+    mock_command_race.assert_called_once_with('2099', '99', ['solution2', 'solution3'],
+                                              input_file='input.txt', runs=3, warmup=0,
+                                              timeout=10.0, json_file=None)
+
+
+@patch('advent_cli.cli.commands.test')
+@patch('advent_cli.server.forward', return_value=3)
+@patch('argparse.ArgumentParser')
+def test_cli_test_forwarded(mock_argparse, mock_forward, mock_command_test):
+    args = mock_argparse.return_value.parse_args.return_value
+    args.command = 'test'
+    args.no_daemon = args.watch = False
+    with patch('sys.argv', ['advent', 'test', '2099/99']):
+        with pytest.raises(SystemExit) as e:
+            cli.main()
+    assert e.value.code == 3
+    mock_forward.assert_called_once_with(['test', '2099/99'])
+    mock_command_test.assert_not_called()
+
+
+@patch('advent_cli.cli.commands.daemon')
+@patch('argparse.ArgumentParser')
+def test_cli_daemon(mock_argparse, mock_command_daemon):
+    args = mock_argparse.return_value.parse_args.return_value
+    args.command = 'daemon'
+    args.action = 'start'
+    args.idle_timeout, args.preload = 5, ('numpy',)
     cli.main()
-    mock_command_submit.assert_called_once_with('2099', '99', solution_file='solution')
+    mock_command_daemon.assert_called_once_with('start', idle_timeout=5, preload=('numpy',))
 
 
 @patch('advent_cli.cli.commands.countdown')
@@ -60,5 +160,7 @@ def test_cli_submit(mock_argparse, mock_command_submit):
 def test_cli_countdown(mock_argparse, mock_command_submit):
     mock_argparse.return_value.parse_args.return_value.date = '2099/99'
     mock_argparse.return_value.parse_args.return_value.command = 'countdown'
+    mock_argparse.return_value.parse_args.return_value.fetch = True
+    mock_argparse.return_value.parse_args.return_value.tui = False
     cli.main()
-    mock_command_submit.assert_called_once_with('2099', '99')
+    mock_command_submit.assert_called_once_with('2099', '99', fetch=True, tui=False)
@@ -0,0 +1,117 @@
+import os
+import pytest
+import requests
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import client
+
+
+@pytest.fixture(autouse=True)
+def session_fixture(tmp_path):
+    client.close_session()
+    client.configure_cache()
+    client._response_cache = None
+    with patch.dict(os.environ, {'ADVENT_CACHE_DIR': str(tmp_path)}):
+        yield
+    client.close_session()
+    client._response_cache = None
+
+
+def make_response(text, status_code=200, headers=None):
+    r = requests.Response()
+    r.status_code = status_code
+    r.url = 'https://adventofcode.com/2099/leaderboard/self'
+    r.headers.update(headers or {})
+    r.encoding = 'utf-8'
+    r._content = text.encode('utf-8')
+    return r
+
+
+def test_session_reused():
+    session = client.get_session()
+    assert client.get_session() is session
+    assert session.cookies.get('session', domain='.adventofcode.com') == ''
+    adapter = session.get_adapter('https://adventofcode.com/')
+    assert adapter.max_retries.total == client.RETRY.total
+    assert 'POST' not in adapter.max_retries.allowed_methods
+
+
+@patch('requests.Session.get')
+def test_get_timeout(mock_get):
+    client.get('https://adventofcode.com/2099/day/1')
+    mock_get.assert_called_once_with('https://adventofcode.com/2099/day/1',
+                                     timeout=client.TIMEOUT)
+
+
+@patch('time.sleep')
+@patch('requests.Session.get')
+@patch('time.monotonic', return_value=100.0)
+def test_get_burst(mock_monotonic, mock_get, mock_sleep, monkeypatch):
+    # the shared limiter at its default rate, only its clock is reset
+    monkeypatch.setattr(client._rate_limiter, '_next_slot', 0.0)
+    client.get('https://adventofcode.com/2099/day/1')
+    client.get('https://adventofcode.com/2099/day/1/input', burst=True)
+    mock_sleep.assert_not_called()
+    client.get('https://adventofcode.com/2099/day/1')
+    assert mock_sleep.call_count == 1
+    assert mock_sleep.call_args[0][0] == pytest.approx(1 / client.DEFAULT_RATE_LIMIT)
+
+
+@patch('requests.Session.post')
+def test_post(mock_post):
+    client.post('https://adventofcode.com/2099/day/1/answer', data={'level': 1})
+    mock_post.assert_called_once_with('https://adventofcode.com/2099/day/1/answer',
+                                      data={'level': 1}, timeout=client.TIMEOUT)
+
+
+@patch('time.sleep')
+@patch('time.monotonic', return_value=100.0)
+def test_rate_limiter(mock_monotonic, mock_sleep):
+    limiter = client.RateLimiter(4)
+    limiter.wait()
+    limiter.wait()
+    limiter.wait()
+    assert mock_sleep.call_args_list == [((0.25,),), ((0.5,),)]
+    limiter.set_rate(None)
+    limiter.wait()
+    assert mock_sleep.call_count == 2
+
+
+@patch('requests.Session.get')
+def test_get_cached(mock_get):
+    mock_get.return_value = make_response('<pre>stats</pre>', headers={'ETag': '"abc"'})
+    url = 'https://adventofcode.com/2099/leaderboard/self'
+    assert client.get(url).text == '<pre>stats</pre>'
+    assert client.get(url).text == '<pre>stats</pre>'
+    mock_get.assert_called_once_with(url, timeout=client.TIMEOUT)
+
+    # stale or refreshed entries are revalidated with a conditional request
+    mock_get.return_value = make_response('', status_code=304)
+    assert client.get(url, refresh=True).text == '<pre>stats</pre>'
+    mock_get.assert_called_with(url, timeout=client.TIMEOUT,
+                                headers={'If-None-Match': '"abc"'})
+
+
+@patch('requests.Session.get')
+def test_get_not_cached(mock_get):
+    mock_get.return_value = make_response('[Log In]')
+    url = 'https://adventofcode.com/2099/leaderboard/self'
+    client.get(url)
+    client.get(url)
+    assert mock_get.call_count == 2
+
+    client.configure_cache(enabled=False)
+    mock_get.return_value = make_response('<pre>stats</pre>')
+    client.get(url)
+    client.get(url)
+    assert mock_get.call_count == 4
+
+
+@patch('requests.Session.head')
+def test_warm_up(mock_head):
+    assert client.warm_up(connections=3)
+    assert mock_head.call_count == 3
+    mock_head.assert_called_with(client.BASE_URL, timeout=client.TIMEOUT)
+    mock_head.side_effect = [None, requests.ConnectionError()]
+    assert not client.warm_up()
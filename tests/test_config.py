@@ -0,0 +1,38 @@
+import os
+import pytest
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import config
+
+
+def test_config_memoized():
+    conf = config.get_config()
+    assert config.get_config() is conf
+    assert conf['private_leaderboards'] == ('1111111',)
+    assert conf['disable_color']
+    with pytest.raises(TypeError):
+        conf['disable_color'] = False
+
+    with patch.dict(os.environ, {'ADVENT_PRIV_BOARDS': '1,2'}):
+        assert config.get_config()['private_leaderboards'] == ('1111111',)
+        config.reload_config()
+        assert config.get_config()['private_leaderboards'] == ('1', '2')
+
+
+@patch.dict(os.environ, {}, clear=True)
+def test_config_no_session_cookie(capsys):
+    config.reload_config()
+    with pytest.raises(SystemExit):
+        config.get_config()
+    assert 'Session cookie not set.' in capsys.readouterr().out
+
+
+def test_config_daemon():
+    assert config.get_config()['daemon_preload'] == config.DEFAULT_DAEMON_PRELOAD
+    assert config.get_config()['daemon_idle_timeout'] == 30
+    with patch.dict(os.environ, {'ADVENT_DAEMON_PRELOAD': 'numpy,,z3',
+                                 'ADVENT_DAEMON_IDLE_TIMEOUT': '0'}):
+        config.reload_config()
+        assert config.get_config()['daemon_preload'] == ('numpy', 'z3')
+        assert config.get_config()['daemon_idle_timeout'] == 0
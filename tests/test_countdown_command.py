@@ -1,5 +1,5 @@
 from freezegun import freeze_time
-from mock import patch
+from mock import patch, MagicMock
 from _fixtures import env_patch_fixture
 
 from advent_cli import commands
@@ -11,3 +11,41 @@ def test_countdown_input(mock_wrapper):
     commands.countdown('2099', '02')
     commands.countdown('2100', '04')
     mock_wrapper.assert_not_called()
+
+
+@patch('advent_cli.commands.write_puzzle_day')
+@patch('advent_cli.unlock.fetch_puzzle_day')
+@patch('advent_cli.unlock.seconds_until_unlock', return_value=-0.25)
+def test_fetch_at_unlock(mock_until, mock_fetch, mock_write, capsys):
+    prompt, r_input = MagicMock(status_code=200, text='prompt'), MagicMock(status_code=200)
+    mock_fetch.return_value = prompt, r_input
+    commands.fetch_at_unlock('2099', '02')
+    mock_write.assert_called_once_with('2099', '02', prompt, r_input)
+    assert capsys.readouterr().out == 'Done 0.25s after unlock\n'
+
+    # nothing is written without the input
+    mock_write.reset_mock()
+    r_input.status_code = 500
+    commands.fetch_at_unlock('2099', '02')
+    mock_write.assert_not_called()
+    assert 'error 500 for the input' in capsys.readouterr().out
+
+
+@freeze_time('2099-12-01')
+@patch('os.path.exists', return_value=True)
+@patch('curses.wrapper')
+def test_countdown_fetch_exists(mock_wrapper, mock_exists, capsys):
+    commands.countdown('2099', '02', fetch=True)
+    mock_wrapper.assert_not_called()
+    assert 'Directory already exists' in capsys.readouterr().out
+
+
+@patch('sys.stdout.isatty', return_value=False)
+def test_countdown_no_tui(mock_isatty, capsys):
+    with freeze_time('2099-12-02 04:58:58.5') as frozen:
+        with patch('time.sleep', side_effect=frozen.tick):
+            commands.countdown('2099', '02', tui=False)
+    assert capsys.readouterr().out == ('2099 day 2 will unlock in:\n'
+                                       '0 hours, 2 minutes, 0 seconds\n'
+                                       '0 hours, 1 minutes, 0 seconds\n'
+                                       'Countdown finished\n')
@@ -1,12 +1,15 @@
+from freezegun import freeze_time
 from mock import patch, call, mock_open, MagicMock
 from _fixtures import env_patch_fixture
 
+import os
+
 from advent_cli import commands
 
 
 @patch('os.makedirs')
 @patch('builtins.open', new_callable=mock_open())
-@patch('requests.get')
+@patch('advent_cli.client.get')
 def test_get(mock_get, mock_open, mock_mkdir):
     mock_get.side_effect = [
         MagicMock(text='''
@@ -48,7 +51,7 @@ def test_get_path_exists(mock_exists, mock_open):
 
 
 @patch('builtins.open', new_callable=mock_open())
-@patch('requests.get')
+@patch('advent_cli.client.get')
 def test_get_puzzle_locked(mock_get, mock_open):
     mock_get.return_value.status_code = 404
     mock_get.return_value.text = ('Please don\'t repeatedly request '
@@ -58,9 +61,34 @@ def test_get_puzzle_locked(mock_get, mock_open):
 
 
 @patch('builtins.open', new_callable=mock_open())
-@patch('requests.get')
+@patch('advent_cli.client.get')
 def test_get_404(mock_get, mock_open):
     mock_get.return_value.status_code = 404
     mock_get.return_value.text = '404 Not Found'
     commands.get('2099', '99')
     mock_open.assert_not_called()
+
+
+@freeze_time('2099-12-03')
+@patch('advent_cli.commands.write_puzzle_day')
+@patch('advent_cli.commands.fetch_puzzle_day')
+@patch('os.path.exists')
+def test_get_year_concurrent(mock_exists, mock_fetch, mock_write, capsys):
+    mock_exists.side_effect = lambda x: x == '2098/03/'
+
+    def fetch(year, day):
+        if day == '02':
+            raise ConnectionError('connection reset')
+        return day, None
+    mock_fetch.side_effect = fetch
+    commands.get('2098', None, jobs=8)
+    assert mock_fetch.call_count == 24
+    mock_write.assert_has_calls([
+        call('2098', f'{day:02}', f'{day:02}', None) for day in range(1, 26)
+        if day not in (2, 3)
+    ])
+    captured_stdout = capsys.readouterr().out
+    assert captured_stdout == ('Failed to download 2098/02:\n'
+                               '  connection reset\n'
+                               'Directory already exists:\n'
+                               f'  {os.getcwd()}/2098/03/\n')
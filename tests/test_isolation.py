@@ -0,0 +1,45 @@
+import signal
+import time
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import isolation
+from advent_cli.isolation import RunStatus
+
+
+@patch('advent_cli.isolation.compute_answers', return_value=(5, 10))
+def test_run_isolated(mock_compute):
+    result = isolation.run_isolated('2099', '99', 'input.txt', timeout=10)
+    assert result.status == RunStatus.OK
+    assert result.answers == (5, 10)
+    assert result.exitcode == 0
+
+
+@patch('advent_cli.isolation.compute_answers', side_effect=ValueError('bad input'))
+def test_run_isolated_error(mock_compute):
+    result = isolation.run_isolated('2099', '99', 'input.txt', timeout=10)
+    assert result.status == RunStatus.ERROR
+    assert 'ValueError: bad input' in result.error
+
+
+@patch('advent_cli.isolation.compute_answers', side_effect=MemoryError)
+def test_run_isolated_oom(mock_compute):
+    result = isolation.run_isolated('2099', '99', 'input.txt', timeout=10)
+    assert result.status == RunStatus.OUT_OF_MEMORY
+
+
+def sleep(*args, **kwargs):
+    time.sleep(5)
+
+
+@patch('advent_cli.isolation.compute_answers', side_effect=sleep)
+def test_run_isolated_timeout(mock_compute):
+    result = isolation.run_isolated('2099', '99', 'input.txt', timeout=0.5)
+    assert result.status == RunStatus.TIMEOUT
+    assert result.elapsed < 5
+
+
+def test_status_from_exitcode():
+    assert isolation.status_from_exitcode(-signal.SIGXCPU) == RunStatus.CPU_LIMIT
+    assert isolation.status_from_exitcode(-signal.SIGKILL) == RunStatus.OUT_OF_MEMORY
+    assert isolation.status_from_exitcode(1) == RunStatus.CRASHED
@@ -0,0 +1,37 @@
+import os
+import pytest
+
+from advent_cli import parsing
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), '_fixtures', 'pages')
+
+
+def read_page(name):
+    with open(os.path.join(PAGES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_main_section():
+    assert parsing.main_section('<nav></nav><main id="x"><p>a</p></main>') == \
+        '<main id="x"><p>a</p></main>'
+    assert parsing.main_section('<article>no main</article>') == '<article>no main</article>'
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_targeted_extraction(parser):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    markup = read_page('day.html')
+    full = parsing.make_soup(markup, parser='html.parser')
+    soup = parsing.make_main_soup(markup, parse_only=parsing.DAY_DESC, parser=parser)
+    assert [a.decode_contents() for a in soup.find_all('article', class_='day-desc')] == \
+        [a.decode_contents() for a in full.find_all('article', class_='day-desc')]
+
+    soup = parsing.make_main_soup(markup, parse_only=parsing.PARAGRAPHS, parser=parser)
+    assert [p.find('code').text for p in soup.find_all('p')
+            if 'Your puzzle answer was' in p.text] == ['54601', '54078']
+
+    markup = read_page('leaderboard_self.html')
+    full = parsing.make_soup(markup, parser='html.parser')
+    soup = parsing.make_main_soup(markup, parse_only=parsing.ARTICLES, parser=parser)
+    assert soup.select('article pre')[0].text == full.select('article pre')[0].text
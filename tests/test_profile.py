@@ -0,0 +1,100 @@
+import os
+import pstats
+import pytest
+
+from _fixtures import env_patch_fixture, make_day
+
+from advent_cli import commands, profiling
+
+SOLUTION = '''
+from lib.helpers import spin
+
+
+def parse_input(lines):
+    return [int(x) for x in lines]
+
+
+def part1(data):
+    return sum(spin(x) for x in data)
+
+
+def part2(data):
+    return max(data)
+'''
+
+HELPERS = '''
+def spin(n):
+    total = 0
+    for i in range(100000 * n):
+        total += i % 7
+    return n
+'''
+
+
+@pytest.fixture
+def day_dir(make_day, tmp_path):
+    day_dir = make_day('2096', solution=SOLUTION)
+    (tmp_path / 'lib').mkdir()
+    (tmp_path / 'lib' / 'helpers.py').write_text(HELPERS)
+    return day_dir
+
+
+def test_profile_cprofile(day_dir):
+    answers, stages, own_files = profiling.profile('2096', '01', str(day_dir / 'input.txt'))
+    assert answers == (6, 3)
+    assert list(stages) == ['parse', 'part1', 'part2']
+    assert own_files == {str(day_dir / 'solution.py'),
+                         os.path.join(os.getcwd(), 'lib', 'helpers.py')}
+
+    functions = stages['part1']['functions']
+    # sorted by own time, nothing from the standard library or advent-cli itself
+    assert functions[0][0][2] == 'spin' and functions[0][1] == 3
+    assert all(frame[0] in own_files for frame, *_ in functions)
+    assert 'spin (lib/helpers.py:2)' in profiling.format_table(functions)
+
+    written = profiling.write_profiles('2096', '01', 'solution', stages, own_files)
+    assert written == [str(day_dir / f'solution.{stage}.prof')
+                       for stage in ('parse', 'part1', 'part2')]
+    assert any(name == 'spin' for _, _, name in pstats.Stats(written[1]).stats)
+
+
+def test_profile_sampling(day_dir):
+    answers, stages, own_files = profiling.profile('2096', '01', str(day_dir / 'input.txt'),
+                                                   profiler='sampling', top=2)
+    assert answers == (6, 3)
+    functions = stages['part1']['functions']
+    assert len(functions) <= 2 and functions[0][0][2] == 'spin'
+    assert functions[0][1] is None
+
+    written = profiling.write_profiles('2096', '01', 'solution', stages, own_files)
+    assert written[1] == str(day_dir / 'solution.part1.collapsed')
+    with open(written[1]) as f:
+        lines = f.read().splitlines()
+    # outermost frame first, starting at the stage function, then the sample count
+    assert any(line.startswith('part1 (2096/01/solution.py:9);')
+               and 'spin (lib/helpers.py:2)' in line for line in lines)
+    assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in lines)
+
+
+def test_collapse():
+    own_files = {'/a.py'}
+    stacks = {
+        (('/runner.py', 1, 'main'), ('/a.py', 1, 'f'), ('/a.py', 5, 'g')): 3,
+        (('/runner.py', 1, 'main'), ('/a.py', 1, 'f')): 1,
+        (('/runner.py', 1, 'main'), ('/runner.py', 9, 'stop')): 2,
+    }
+    collapsed = profiling.collapse(stacks, own_files).splitlines()
+    labels = [line.replace(os.path.relpath('/a.py'), 'a.py') for line in collapsed]
+    assert labels == ['f (a.py:1) 1', 'f (a.py:1);g (a.py:5) 3']
+
+    functions = profiling.hot_functions_sampled(stacks, own_files, elapsed=6.0)
+    times = {frame[2]: (own, total) for frame, _, own, total in functions}
+    assert times == {'f': (1.0, 4.0), 'g': (3.0, 3.0)}
+
+
+def test_test_command_profile(day_dir, capsys):
+    commands.test('2096', '01', profiler='cprofile', top=3)
+    output = capsys.readouterr().out
+    assert 'Part 1: 6' in output and 'Part 2: 3' in output
+    assert 'spin (lib/helpers.py:2)' in output
+    assert 'Wrote 2096/01/solution.part2.prof' in output
@@ -0,0 +1,66 @@
+import json
+import pytest
+
+from _fixtures import env_patch_fixture, make_day, SOLUTION
+
+from advent_cli import commands, racing
+
+
+@pytest.fixture
+def day_dir(make_day):
+    day_dir = make_day('2094')
+    (day_dir / 'fast.py').write_text(SOLUTION)
+    (day_dir / 'wrong.py').write_text(SOLUTION.replace('max(data)', 'min(data)'))
+    (day_dir / 'broken.py').write_text(SOLUTION.replace('return sum(data)', '1 / 0'))
+    (day_dir / 'slow.py').write_text(SOLUTION.replace('return sum(data)',
+                                                      'while True: pass'))
+    return day_dir
+
+
+def test_run_once(day_dir):
+    input_file = str(day_dir / 'input.txt')
+    status, answers, times, rss = racing.run_once('2094', '01', input_file, 'solution')
+    assert (status, answers, len(times)) == (racing.RunStatus.OK, (6, 3), 3)
+    assert rss is None or rss > 0
+
+    status, error, _, _ = racing.run_once('2094', '01', input_file, 'broken')
+    assert status == racing.RunStatus.ERROR and 'ZeroDivisionError' in error
+
+    assert racing.run_once('2094', '01', input_file, 'slow', timeout=0.5)[0] \
+        == racing.RunStatus.TIMEOUT
+
+
+def test_rank():
+    def result(variant, total, answers=(1, 2)):
+        return {'variant': variant, 'status': 'ok', 'answers': answers, 'total': total,
+                'median': {'parse': 0, 'part1': total, 'part2': 0}, 'peak_rss': None}
+
+    results = racing.rank([
+        result('solution', 100), result('fast', 25), result('wrong', 10, answers=(1, 3)),
+        {'variant': 'broken', 'status': 'error', 'error': 'Traceback'},
+    ], 'solution')
+    assert [r['variant'] for r in results] == ['fast', 'solution', 'wrong', 'broken']
+    assert [r['speedup'] for r in results] == [4.0, 1.0, 10.0, None]
+    assert [r['agrees'] for r in results] == [True, True, False, None]
+
+    table = racing.format_table({'baseline': 'solution', 'results': results})
+    assert '4.00x' in table and 'different' in table and 'error' in table
+
+
+def test_race_command(day_dir, tmp_path, capsys):
+    json_file = tmp_path / 'race.json'
+    commands.race('2094', '01', ['fast.py', 'wrong', 'broken'], runs=2,
+                  json_file=str(json_file))
+    output = capsys.readouterr().out
+    assert 'Racing solution.py, fast.py, wrong.py, broken.py' in output
+    assert 'wrong.py answers differ from solution.py: 6, 1' in output
+    assert 'broken.py raised an exception:' in output
+
+    result = json.loads(json_file.read_text())
+    variants = {r['variant']: r for r in result['results']}
+    assert variants['fast']['runs'] == 2 and variants['fast']['agrees'] is True
+    # a failed variant isn't run again
+    assert variants['broken']['status'] == 'error'
+
+    commands.race('2094', '01', ['missing'])
+    assert 'Solution file does not exist' in capsys.readouterr().out
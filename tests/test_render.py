@@ -0,0 +1,27 @@
+import os
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import config, render
+
+
+def test_render_stars_disabled():
+    assert render.render_stars([2, 2, 1, 0, 0, None, None]) == '**/..  '
+
+
+@patch.dict(os.environ, {'ADVENT_DISABLE_TERMCOLOR': '0'})
+@patch('advent_cli.utils.tc_colored', side_effect=lambda text, color: f'<{color}>{text}')
+def test_render_stars_enabled(mock_tc_colored):
+    config.reload_config()
+    assert render.render_stars([2, 2, 2, 1, None, 0, 0]) == '<yellow>***<cyan>* <grey>**'
+    assert mock_tc_colored.call_count == 3
+
+
+def test_buffer(capsys):
+    out = render.Buffer()
+    out.print('a', 1, end='')
+    out.print('b', sep='-')
+    out.print()
+    assert capsys.readouterr().out == ''
+    out.flush()
+    assert capsys.readouterr().out == 'a 1b\n\n'
@@ -0,0 +1,168 @@
+from mock import patch
+from _fixtures import env_patch_fixture, make_day, SOLUTION
+
+import os
+import types
+
+from advent_cli import commands, results
+
+
+@patch('advent_cli.results.compute_answers', return_value=(5, 10))
+def test_reference_answers(mock_compute, make_day):
+    day_dir = make_day('2099', '99', solution='def part1(data): pass\n', input_text='1\n2\n')
+    input_file = str(day_dir / 'input.txt')
+
+    assert results.reference_answers('2099', '99', input_file) == ((5, 10), False)
+    assert results.reference_answers('2099', '99', input_file) == ((5, 10), True)
+    assert mock_compute.call_count == 1
+
+    # editing either the solution or the input misses the cache
+    (day_dir / 'input.txt').write_text('1\n2\n3\n')
+    assert results.reference_answers('2099', '99', input_file) == ((5, 10), False)
+    (day_dir / 'solution.py').write_text('def part1(data): return 1\n')
+    assert results.reference_answers('2099', '99', input_file) == ((5, 10), False)
+    assert mock_compute.call_count == 3
+
+
+@patch('advent_cli.results.compute_answers', return_value=(5, 10))
+def test_reference_answers_unreadable(mock_compute):
+    assert results.reference_answers('2099', '99', '/missing/input.txt') == ((5, 10), False)
+    assert results.reference_answers('2099', '99', '/missing/input.txt') == ((5, 10), False)
+    assert mock_compute.call_count == 2
+
+
+def test_local_dependencies(tmp_path):
+    (tmp_path / 'lib').mkdir()
+    (tmp_path / 'lib' / '__init__.py').write_text('')
+    (tmp_path / 'lib' / 'grid.py').write_text('from . import points\nimport os\n')
+    (tmp_path / 'lib' / 'points.py').write_text('')
+    day_dir = tmp_path / '2099' / '99'
+    day_dir.mkdir(parents=True)
+    (day_dir / 'helpers.py').write_text('')
+    solution = day_dir / 'solution.py'
+    solution.write_text('import re\nfrom lib.grid import Grid\nfrom .helpers import parse\n')
+    assert results.local_dependencies(str(solution), str(tmp_path)) == sorted([
+        str(day_dir / 'helpers.py'), str(tmp_path / 'lib' / '__init__.py'),
+        str(tmp_path / 'lib' / 'grid.py'), str(tmp_path / 'lib' / 'points.py'),
+    ])
+
+
+def test_result_cache_lru(tmp_path):
+    cache = results.ResultCache(str(tmp_path), max_size=10 ** 6)
+    for age, key in enumerate('cba', start=1):
+        cache.store(key, (key, None), 0.5)
+        os.utime(tmp_path / f'{key}.pickle', (age, age))
+    assert cache.load('z') is None
+    # reading "c" makes it the most recently used, "b" and "a" are evicted first
+    assert cache.load('c')['answers'] == ('c', None)
+    cache.max_size = 2 * os.path.getsize(tmp_path / 'c.pickle') + 10
+    cache.store('d', ('d', None), 0.5)
+    assert sorted(os.listdir(tmp_path)) == ['c.pickle', 'd.pickle']
+
+
+class Counted:
+    pickled = 0
+
+    def __reduce__(self):
+        Counted.pickled += 1
+        return int, (0,)
+
+
+def test_result_cache_too_large(tmp_path):
+    cache = results.ResultCache(str(tmp_path), max_size=1000)
+    assert cache.write('a', {'data': [Counted() for _ in range(10 ** 5)]}) is None
+    # pickling stopped soon after passing the limit rather than going through everything
+    assert Counted.pickled < 10 ** 5
+    assert os.listdir(tmp_path) == []
+    assert cache.write('b', {'data': list(range(10))})['data'] == list(range(10))
+    assert cache.load('b')['data'] == list(range(10))
+
+
+@patch('advent_cli.commands.results.compute_stages', return_value=((5, 10), []))
+def test_run_solution_cached(mock_compute, make_day, capsys):
+    day_dir = make_day('2099', '99', solution='', input_text='1\n')
+    input_file = str(day_dir / 'input.txt')
+
+    assert commands.run_solution('2099', '99', input_file) == (5, 10)
+    assert commands.run_solution('2099', '99', input_file) == (5, 10)
+    assert mock_compute.call_count == 1
+    assert '(Cached answers from ' in capsys.readouterr().out
+
+    results.configure_cache(enabled=False)
+    with patch('advent_cli.commands.compute_answers', return_value=(5, 10)) as mock_answers:
+        assert commands.run_solution('2099', '99', input_file) == (5, 10)
+    assert mock_answers.call_count == 1
+
+
+# module level code goes into every stage's key
+STAGED_SOLUTION = 'import math\n' + SOLUTION
+
+
+@patch('advent_cli.results.load_solution')
+def test_compute_stages(mock_load, make_day):
+    # keys come from the source on disk, what actually runs is the mock
+    calls = []
+    mock_load.return_value = types.SimpleNamespace(
+        parse_input=lambda lines: calls.append('parse') or [int(x) for x in lines],
+        part1=lambda data: calls.append('part1') or sum(data),
+        part2=lambda data: calls.append('part2') or max(data),
+    )
+    day_dir = make_day('2099', '99', solution=STAGED_SOLUTION)
+    solution, input_file = day_dir / 'solution.py', str(day_dir / 'input.txt')
+
+    def compute():
+        keys = results.stage_keys('2099', '99', input_file)
+        return results.compute_stages('2099', '99', input_file, keys)
+
+    assert compute() == ((6, 3), [])
+    assert compute() == ((6, 3), ['part1', 'part2'])
+    assert calls == ['parse', 'part1', 'part2']
+
+    # only part2 changed, part1 and the parsed input are reused; part1 still runs
+    # first since with the default copy it could change what part2 gets
+    solution.write_text(STAGED_SOLUTION.replace('max(data)', 'min(data)'))
+    assert compute() == ((6, 3), ['parse', 'part1'])
+    assert calls[3:] == ['part1', 'part2']
+
+    # anything outside the stage functions could affect every stage
+    solution.write_text(STAGED_SOLUTION.replace('import math', 'import cmath'))
+    assert compute() == ((6, 3), [])
+    assert calls[5:] == ['parse', 'part1', 'part2']
+
+
+@patch('advent_cli.results.load_solution')
+def test_compute_stages_part1_changes_data(mock_load, make_day):
+    def part1(rows):
+        for row in rows:
+            row.append(0)
+        return sum(map(len, rows))
+
+    mock_load.return_value = types.SimpleNamespace(
+        parse_input=lambda lines: [[int(x)] for x in lines], part1=part1,
+        part2=lambda rows: sum(map(len, rows)),
+    )
+    day_dir = make_day('2099', '99', solution=STAGED_SOLUTION)
+    solution, input_file = day_dir / 'solution.py', str(day_dir / 'input.txt')
+
+    def compute():
+        keys = results.stage_keys('2099', '99', input_file)
+        return results.compute_stages('2099', '99', input_file, keys)
+
+    assert compute() == ((6, 6), [])
+    solution.write_text(STAGED_SOLUTION.replace('max(data)', 'min(data)'))
+    assert compute() == ((6, 6), ['parse', 'part1'])
+
+    # deepcopy keeps part1's changes away from part2, so part1 isn't run again
+    mock_load.return_value.DATA_SHARING = 'deepcopy'
+    mock_load.return_value.part1 = None
+    solution.write_text(STAGED_SOLUTION.replace('max(data)', 'len(data)'))
+    assert compute() == ((6, 3), ['parse', 'part1'])
+
+
+def test_stage_sources(tmp_path):
+    path = tmp_path / 'solution.py'
+    path.write_text(STAGED_SOLUTION.replace('return max(data)', 'return part1(data) * 2'))
+    context, sources = results.stage_sources(str(path))
+    assert context == 'import math\n\n\n\n\n\n'
+    assert sources['part2'].startswith('def part2(data):\n    return part1(data) * 2\n')
+    assert 'return sum(data)' in sources['part2']
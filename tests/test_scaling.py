@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+import pytest
+
+from _fixtures import env_patch_fixture, make_day, SOLUTION
+
+from advent_cli import commands, scaling
+
+# part1 can't handle the largest prefix
+LIMITED_SOLUTION = SOLUTION.replace('    return sum(data)',
+                                    "    if len(data) > 8:\n"
+                                    "        raise ValueError('too many')\n"
+                                    "    return sum(data)")
+
+GENERATOR = '''
+def generate_input(size):
+    return ''.join(f'{i}\\n' for i in range(size))
+'''
+
+
+@pytest.fixture
+def day_dir(make_day):
+    day_dir = make_day('2095', solution=LIMITED_SOLUTION,
+                       input_text=''.join(f'{i}\n' for i in range(32)))
+    (day_dir / 'gen.py').write_text(GENERATOR)
+    return day_dir
+
+
+def test_prefix_inputs():
+    unit, inputs = scaling.prefix_inputs(b'1\n2\n3\n4\n5\n6\n7\n8\n', steps=3)
+    assert unit == 'lines'
+    assert inputs == [(1, b'1\n'), (2, b'1\n2\n'), (4, b'1\n2\n3\n4\n')]
+
+    # a single line is cut by characters instead
+    unit, inputs = scaling.prefix_inputs(b'abcdefgh\n', steps=2)
+    assert unit == 'chars'
+    assert inputs == [(2, b'ab\n'), (4, b'abcd\n')]
+
+
+@pytest.mark.parametrize('curve', ['O(n)', 'O(n log n)', 'O(n²)'])
+def test_fit_complexity(curve):
+    points = [(size, 3.0 * scaling.COMPLEXITIES[curve](size)) for size in (100, 200, 400, 800)]
+    fit = scaling.fit_complexity(points, full_size=1600)
+    assert fit['complexity'] == curve
+    assert fit['projected'] == pytest.approx(3.0 * scaling.COMPLEXITIES[curve](1600))
+    assert scaling.fit_complexity(points[:1]) is None
+
+
+def test_scale_prefixes(day_dir):
+    result = scaling.scale('2095', '01', str(day_dir / 'input.txt'), runs=1, warmup=0)
+    assert (result['source'], result['unit'], result['full_size']) == ('prefix', 'lines', 32)
+    assert [sample['size'] for sample in result['samples']] == [1, 2, 4, 8, 16]
+    # the largest prefix makes part1 raise, it's reported and left out of the fit
+    assert result['samples'][-1]['error'] == 'ValueError: too many'
+    assert all(sample['part1'] > 0 for sample in result['samples'][:-1])
+    assert set(result['fits']) == {'parse', 'part1', 'part2'}
+    assert result['fits']['part2']['projected'] > 0
+
+    assert 'ValueError: too many' in scaling.format_table(result)
+    assert 'At 32 lines' in scaling.format_fit_table(result)
+    rows = list(csv.DictReader(io.StringIO(scaling.format_csv(result))))
+    assert [row['size'] for row in rows] == ['1', '2', '4', '8', '16']
+    assert rows[0]['error'] == '' and rows[-1]['part1_ns'] == ''
+    assert json.loads(scaling.format_json(result))['samples'][0]['size'] == 1
+
+
+def test_bench_command_generator(day_dir, tmp_path, capsys):
+    csv_file = tmp_path / 'scaling.csv'
+    commands.bench('2095', '01', scale=True, generator='gen', sizes=[4, 2, 6], runs=1,
+                   full_size=100, csv_file=str(csv_file))
+    output = capsys.readouterr().out
+    assert 'Using inputs from gen.generate_input' in output
+    assert 'At size 100' in output
+    assert csv_file.read_text().splitlines()[1].startswith('2,4,')
+
+    # the input file's line count says nothing about the generator's sizes
+    result = scaling.scale('2095', '01', str(day_dir / 'input.txt'), generator='gen',
+                           sizes=[2, 4], runs=1, warmup=0)
+    assert result['full_size'] is None
+    assert result['fits']['part2']['projected'] is None
+    assert 'At ' not in scaling.format_fit_table(result)
+
+    commands.bench('2095', '01', scale=True, generator='missing')
+    assert 'Generator file does not exist' in capsys.readouterr().out
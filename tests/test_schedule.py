@@ -0,0 +1,34 @@
+from freezegun import freeze_time
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import schedule
+
+
+def test_ticks():
+    slept = []
+    # 2.75 seconds before midnight EST
+    with freeze_time('2099-12-01 04:59:57.25') as frozen:
+        target = schedule.deadline(4099784400.0)
+
+        def sleep(seconds):
+            slept.append(seconds)
+            frozen.tick(seconds)
+        with patch('time.sleep', side_effect=sleep):
+            assert list(schedule.ticks(target)) == [3, 2, 1, 0]
+    # straight to the next second boundary, then whole seconds
+    assert slept == [0.75, 1.0, 1.0]
+
+
+def test_ticks_step_and_early_wakeups():
+    with freeze_time('2099-12-01 04:57:30') as frozen:
+        target = schedule.deadline(4099784400.0)
+        # woken up early (e.g. a key press) and late, neither changes what is shown
+        waits = iter([10.0, 0.5, 20.0, 30.5, 60.0, 29.0])
+        shown = list(schedule.ticks(target, step=60,
+                                    wait=lambda seconds: frozen.tick(next(waits))))
+    assert shown == [180, 120, 60, 0]
+
+
+def test_split_seconds():
+    assert schedule.split_seconds(3 * 3600 + 25 * 60 + 7) == (3, 25, 7)
@@ -0,0 +1,136 @@
+import json
+import os
+import pytest
+import socket
+import sys
+import threading
+import time
+
+from mock import patch
+from _fixtures import env_patch_fixture, make_day, SOLUTION
+
+from advent_cli import commands, server
+
+# output to relay back to the client
+WORKING_SOLUTION = SOLUTION.replace('    return sum(data)',
+                                    "    print('working')\n    return sum(data)")
+
+pytestmark = pytest.mark.skipif(not server.SUPPORTED, reason='needs fork and Unix sockets')
+
+
+def serve_in_thread(daemon):
+    # signal handlers can only be installed from the main thread
+    with patch('signal.signal'):
+        thread = threading.Thread(target=daemon.serve, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while server.status() is None and thread.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.02)
+    return thread
+
+
+@pytest.fixture
+def daemon(make_day):
+    make_day('2093', solution=WORKING_SOLUTION)
+    thread = serve_in_thread(server.Daemon(server.socket_path(), 0,
+                                           preload=('json', 'missing')))
+    yield thread
+    server.stop()
+    thread.join(5)
+
+
+def test_forward(daemon, capfd):
+    info = server.status()
+    assert info['pid'] == os.getpid() and info['preloaded'] == ['json']
+
+    assert server.forward(['test', '2093/01', '--no-cache']) == 0
+    output = capfd.readouterr().out
+    assert 'working\nPart 1: 6\nPart 2: 3\n' in output
+
+    # exit codes come back too
+    day_dir = os.path.join('2093', '01')
+    with open(os.path.join(day_dir, 'solution1.txt'), 'w') as f:
+        f.write('7')
+    assert server.forward(['test', '2093/01', '--verify', '--no-cache']) == 1
+    assert server.status()['served'] == 2
+
+
+def run(request):
+    with server.connect() as conn:
+        conn.sendall(json.dumps(request).encode() + b'\n')
+        output = b''
+        for kind, payload in server.read_frames(conn):
+            if kind == server.EXIT:
+                return int(payload), output.decode()
+            output += payload
+
+
+def test_forward_other_project(daemon, tmp_path, monkeypatch):
+    # a daemon started with "python -m advent_cli" has its own directory on the path,
+    # a client elsewhere must still get its own solution
+    monkeypatch.setattr('sys.path', [str(tmp_path), *sys.path])
+    other = tmp_path / 'other'
+    (other / '2093' / '01').mkdir(parents=True)
+    (other / '2093' / '01' / 'solution.py').write_text(WORKING_SOLUTION.replace('sum', 'len'))
+    (other / '2093' / '01' / 'input.txt').write_text('4\n5\n')
+    monkeypatch.chdir(other)
+    request = server.run_request(['test', '2093/01', '--no-cache'])
+    # as if run from the installed "advent" script, the project isn't on the path at all
+    request['path'] = [path for path in sys.path if path != str(tmp_path)]
+    code, output = run(request)
+    assert code == 0
+    assert output.endswith(f'{other}/2093/01/input.txt\nworking\nPart 1: 2\nPart 2: 5\n')
+
+
+def test_forward_falls_back(daemon, monkeypatch):
+    # an older or newer advent-cli, or another interpreter, must not run this one's commands
+    unsupported = {'error': 'unsupported', 'version': server.__version__,
+                   'executable': sys.executable}
+    request = server.run_request(['test'])
+    assert server.request({**request, 'version': '0.0.0'}) == unsupported
+    assert server.request({**request, 'executable': '/other/python'}) == unsupported
+
+    monkeypatch.setenv(server.WORKER_ENV, '1')
+    assert server.forward(['test', '2093/01']) is None
+
+
+def test_stop(daemon):
+    assert server.stop()
+    daemon.join(5)
+    assert not daemon.is_alive()
+    assert not os.path.exists(server.socket_path())
+    assert server.status() is None
+    assert not server.stop()
+
+
+def test_idle_shutdown():
+    thread = serve_in_thread(server.Daemon(server.socket_path(), 0.2))
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not os.path.exists(server.socket_path())
+
+
+def test_interrupted_run(daemon, tmp_path):
+    (tmp_path / '2093' / '01' / 'solution.py').write_text(WORKING_SOLUTION.replace(
+        "print('working')", "print('working', flush=True); import time; time.sleep(60)"))
+    conn = server.connect()
+    conn.sendall(json.dumps(server.run_request(['test', '2093/01', '--no-cache'])).encode()
+                 + b'\n')
+    output = b''
+    frames = server.read_frames(conn)
+    while b'working' not in output:
+        output += next(frames)[1]
+    assert server.status()['running'] == 1
+    # the client going away kills the run, shutdown since the frame reader keeps the fd open
+    conn.shutdown(socket.SHUT_RDWR)
+    conn.close()
+    deadline = time.monotonic() + 5
+    while server.status()['running'] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert server.status()['running'] == 0
+
+
+def test_daemon_command_not_running(capsys):
+    commands.daemon('status')
+    commands.daemon('stop')
+    assert capsys.readouterr().out == 'Daemon is not running\nDaemon is not running\n'
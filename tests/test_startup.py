@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+# only needed by commands that go to the network, render pages, profile or draw the countdown,
+# "advent test" and "advent --version" must not pay for them
+HEAVY_MODULES = ('bs4', 'cProfile', 'curses', 'jinja2', 'markdownify', 'pytz', 'requests',
+                 'tabulate')
+
+# cumulative import time of advent_cli.cli in microseconds, best of a few runs
+STARTUP_BUDGET_US = 150_000
+
+
+def import_times(module):
+    # parses "import time: self [us] | cumulative | imported package" lines
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_imports_are_lazy():
+    imported = {name.split('.')[0] for name in import_times('advent_cli.cli')}
+    assert imported.isdisjoint(HEAVY_MODULES), imported & set(HEAVY_MODULES)
+
+
+def test_cli_startup_budget():
+    best = min(import_times('advent_cli.cli')['advent_cli.cli'] for _ in range(3))
+    assert best < STARTUP_BUDGET_US, f'importing advent_cli.cli took {best / 1000:.1f} ms'
@@ -6,7 +6,7 @@ from advent_cli import commands
 
 
 @freeze_time('2099-12-03 05:00:00')
-@patch('requests.get')
+@patch('advent_cli.client.get')
 def test_personal_stats(mock_get, capsys):
     mock_get.return_value.text = (
         '<article><pre>'
@@ -36,9 +36,10 @@ def test_personal_stats(mock_get, capsys):
 
 
 @freeze_time('2099-12-03 05:00:00')
-@patch('requests.get')
+@patch('advent_cli.client.get')
 def test_private_stats(mock_get, capsys):
     mock_get.side_effect = [
+        MagicMock(status_code=404),
         MagicMock(text=(
             '<article><p>'
             'This is the private leaderboard of example for Advent of Code 2099.'
@@ -75,9 +76,10 @@ def test_private_stats(mock_get, capsys):
 
 
 @freeze_time('2099-12-03 05:00:00')
-@patch('requests.get')
+@patch('advent_cli.client.get')
 def test_private_stats(mock_get, capsys):
     mock_get.side_effect = [
+        MagicMock(status_code=404),
         MagicMock(text=(
             '<div class="user">Your Name<span class="star-count">99*</span></div>'
             '<article><p>'
@@ -104,3 +106,38 @@ def test_private_stats(mock_get, capsys):
         ' 1) 99 */.                       example (https://github.com/example)\n\n'
         '(* 2 stars) (/ 1 star) (. 0 stars)\n\n'
     )
+
+
+@freeze_time('2099-12-03 05:00:00')
+@patch('advent_cli.client.get')
+def test_private_stats_json(mock_get, capsys):
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {
+        'event': '2099',
+        'owner_id': 2,
+        'members': {
+            '1': {'id': 1, 'name': None, 'local_score': 92, 'stars': 2,
+                  'last_star_ts': 20,
+                  'completion_day_level': {'1': {'1': {}, '2': {}}}},
+            '2': {'id': 2, 'name': 'example', 'local_score': 99, 'stars': 3,
+                  'last_star_ts': 10,
+                  'completion_day_level': {'1': {'1': {}, '2': {}}, '2': {'1': {}}}},
+            '3': {'id': 3, 'name': 'example3', 'local_score': 92, 'stars': 2,
+                  'last_star_ts': 30,
+                  'completion_day_level': {'2': {'1': {}, '2': {}}}},
+        }
+    }
+    commands.private_leaderboard_stats('2099')
+    mock_get.assert_called_once_with(
+        'https://adventofcode.com/2099/leaderboard/private/view/1111111.json'
+    )
+    captured_stdout = capsys.readouterr().out
+    assert captured_stdout == (
+        '\nexample\'s private leaderboard (1111111)\n\n'
+        '                1111111111222222\n'
+        '       1234567890123456789012345\n'
+        ' 1) 99 */.                       example\n'
+        ' 2) 92 *..                       (anonymous user #1)\n'
+        '    92 .*.                       example3\n\n'
+        '(* 2 stars) (/ 1 star) (. 0 stars)\n\n'
+    )
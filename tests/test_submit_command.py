@@ -14,7 +14,7 @@ def test_submit_no_solution(mock_exists, mock_compute, capsys):
 
 
 @patch('builtins.open', new_callable=mock_open())
-@patch('requests.get')
+@patch('advent_cli.client.get')
 @patch('advent_cli.commands.submit_answer', return_value=(Status.PASS, None))
 @patch('advent_cli.commands.compute_answers', return_value=(5, None))
 @patch('os.path.exists', return_value=True)
@@ -1,7 +1,7 @@
 from mock import patch
 from _fixtures import env_patch_fixture
 
-from advent_cli import commands
+from advent_cli import bench, commands, isolation
 
 
 @patch('advent_cli.commands.compute_answers', return_value=(None, None))
@@ -88,3 +88,46 @@ def test_test_no_dir(mock_exists, mock_getcwd, capsys):
     captured_stdout = capsys.readouterr().out
     assert captured_stdout == ('Directory does not exist:\n'
                                '  "/fake/path/2099/99/"\n')
+
+
+@patch('advent_cli.commands.benchmark')
+@patch('os.path.exists', return_value=True)
+def test_test_bench(mock_exists, mock_benchmark, capsys):
+    mock_benchmark.return_value = {
+        'runs': 5, 'answers': {'part1': 6, 'part2': 3},
+        'stages': {stage: {'min': 1, 'median': 1, 'stdev': 0, 'peak_memory': 0}
+                   for stage in bench.STAGES},
+        'fan_out': {'policy': 'copy', 'peak_memory': 2048, 'time': 1500}
+    }
+    commands.test('2099', '99', input_file='input.txt', bench=True)
+    captured_stdout = capsys.readouterr().out
+    assert 'Part 1: 6\nPart 2: 3\n' in captured_stdout
+    assert 'Data for part 1 and part 2 (copy): 2.0 KiB in 1.50 µs' in captured_stdout
+    assert '(5 runs after 1 warmup)' in captured_stdout
+
+
+@patch('advent_cli.isolation.run_isolated')
+@patch('os.path.exists', return_value=True)
+def test_test_isolated(mock_exists, mock_run_isolated, capsys):
+    mock_run_isolated.return_value = isolation.RunResult(isolation.RunStatus.OK, 5, 10)
+    commands.test('2099', '99', input_file='input.txt', isolate=True)
+    assert capsys.readouterr().out.endswith('Part 1: 5\nPart 2: 10\n')
+
+    mock_run_isolated.return_value = isolation.RunResult(isolation.RunStatus.TIMEOUT)
+    commands.test('2099', '99', input_file='input.txt', isolate=True, timeout=2)
+    assert capsys.readouterr().out.endswith('Solution timed out after 2 seconds\n')
+
+
+@patch('advent_cli.commands.verify.read_expected', return_value=('5', '11'))
+@patch('advent_cli.commands.compute_answers', return_value=(5, 10))
+@patch('os.path.exists', return_value=True)
+def test_test_verify(mock_exists, mock_compute, mock_read_expected, capsys, tmp_path):
+    json_file = tmp_path / 'verify.json'
+    assert not commands.test('2099', '99', input_file='input.txt', verify_answers=True,
+                             fail_fast=True, json_file=str(json_file))
+    assert mock_compute.call_args.kwargs['expected_part1'] == '5'
+    captured_stdout = capsys.readouterr().out
+    assert ('Part 1: 5\nPart 2: 10\n'
+            'Part 1 matches solution1.txt\n'
+            'Part 2 does not match solution2.txt (expected 11)\n') in captured_stdout
+    assert '"verdict": "fail"' in json_file.read_text()
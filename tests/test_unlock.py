@@ -0,0 +1,59 @@
+import requests
+from freezegun import freeze_time
+from mock import patch
+from _fixtures import env_patch_fixture
+
+from advent_cli import unlock
+
+LOCKED = "Please don't repeatedly request this endpoint before it unlocks!"
+
+
+def make_response(text, status_code=200):
+    r = requests.Response()
+    r.status_code = status_code
+    r._content = text.encode('utf-8')
+    r.encoding = 'utf-8'
+    return r
+
+
+@freeze_time('2099-12-02 04:59:58')
+def test_seconds_until_unlock():
+    # midnight EST is 5:00 UTC
+    assert unlock.seconds_until_unlock('2099', '02') == 2
+
+
+@patch('time.sleep')
+@patch('advent_cli.client.get')
+def test_fetch_puzzle_day(mock_get, mock_sleep):
+    responses = {
+        'https://adventofcode.com/2099/day/2': [make_response(LOCKED, 404),
+                                                make_response('prompt')],
+        'https://adventofcode.com/2099/day/2/input': [make_response(LOCKED, 404),
+                                                      make_response(LOCKED, 404),
+                                                      make_response('1\n2\n')],
+    }
+    bursts = {url: [] for url in responses}
+
+    def get(url, refresh, burst):
+        bursts[url].append(burst)
+        return responses[url].pop(0)
+    mock_get.side_effect = get
+    prompt, r_input = unlock.fetch_puzzle_day('2099', '02')
+    assert prompt.text == 'prompt' and r_input.text == '1\n2\n'
+    # the first attempt and the first retry of each don't wait for the rate limiter
+    assert bursts == {'https://adventofcode.com/2099/day/2': [True, True],
+                      'https://adventofcode.com/2099/day/2/input': [True, True, False]}
+    # both start from the shortest delay and back off separately
+    delays = sorted(args[0] for args, _ in mock_sleep.call_args_list)
+    assert delays == [unlock.RETRY_DELAY, unlock.RETRY_DELAY, unlock.RETRY_DELAY * 2]
+
+
+@patch('time.sleep')
+@patch('advent_cli.client.get')
+def test_fetch_when_unlocked_gives_up(mock_get, mock_sleep):
+    mock_get.return_value = make_response(LOCKED, 404)
+    with patch('time.monotonic', side_effect=[0.0, 0.5, 1.0]):
+        r = unlock.fetch_when_unlocked('https://adventofcode.com/2099/day/2', deadline=1.0)
+    assert unlock.is_locked(r)
+    assert mock_get.call_count == 3
+    assert not unlock.is_locked(make_response('404 Not Found', 404))
@@ -1,8 +1,15 @@
-from mock import patch, mock_open
+from mock import patch, mock_open, MagicMock
 from _fixtures import env_patch_fixture
 
+import multiprocessing
 import os
-from advent_cli import utils
+import pickle
+import pytest
+import sys
+import types
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from advent_cli import config, utils
 
 
 def test_utils_colored_disabled():
@@ -15,6 +22,7 @@ def test_utils_colored_disabled():
 @patch.dict(os.environ, {'ADVENT_DISABLE_TERMCOLOR': '0'})
 @patch('advent_cli.utils.tc_colored')
 def test_utils_colored_enabled(mock_tc_colored):
+    config.reload_config()
     _ = utils.colored('text', 'red')
     mock_tc_colored.assert_called_once_with('text', 'red')
 
@@ -33,39 +41,173 @@ def test_compute_answers(mock_import_module):
     assert part1_answer == 36
     assert part2_answer == 8
 
-    # test generator
+    # test generator, parsed again for part2 instead of buffered with tee
+    mock_import_module.return_value.parse_input.reset_mock()
     mock_import_module.return_value.parse_input.side_effect = \
         lambda l: ([int(x) for x in line.split(',')] for line in l)
     part1_answer, part2_answer = utils.compute_answers('2099', '92', '2099/92/example_input.txt')
     assert part1_answer == 36
     assert part2_answer == 8
-
-
-@patch('requests.post')
+    assert mock_import_module.return_value.parse_input.call_count == 2
+
+
+def test_input_mode():
+    def parse_text(data: str): pass
+    def parse_lazy(lines: typing.Iterator[str]): pass
+    def parse_lines(lines): pass
+    for parse_input, mode in ((parse_text, 'text'), (parse_lazy, 'iter'),
+                              (parse_lines, 'lines')):
+        assert utils.input_mode(types.SimpleNamespace(parse_input=parse_input)) == mode
+    assert utils.input_mode(types.SimpleNamespace(parse_input=parse_text,
+                                                  INPUT_MODE='mmap')) == 'mmap'
+    with pytest.raises(ValueError):
+        utils.input_mode(types.SimpleNamespace(parse_input=parse_lines, INPUT_MODE='lazy'))
+
+
+def test_load_input(tmp_path):
+    file_path = tmp_path / 'input.txt'
+    file_path.write_bytes(b'1,2\r\n3,4\n')
+    solution = types.SimpleNamespace(parse_input=None)
+    for mode, expected in (('lines', ['1,2', '3,4']), ('text', '1,2\n3,4\n'),
+                           ('bytes', b'1,2\r\n3,4\n'), ('mmap', b'1,2\r\n3,4\n'),
+                           ('memoryview', b'1,2\r\n3,4\n')):
+        solution.INPUT_MODE = mode
+        assert utils.load_input(solution, file_path)[:] == expected
+    solution.INPUT_MODE = 'iter'
+    assert next(utils.load_input(solution, file_path)) == '1,2'
+
+    file_path.write_bytes(b'')
+    solution.INPUT_MODE = 'mmap'
+    assert utils.load_input(solution, file_path) == b''
+
+
+def test_split_data():
+    # a tuple is several arguments, each one is copied
+    data = ([1, 2], {'a': 1})
+    data1, data2 = utils.split_data(data)
+    data1[0].append(3)
+    assert data2 == ([1, 2], {'a': 1})
+
+    nested = [[1], [2]]
+    data1, data2 = utils.split_data(nested, 'deepcopy')
+    data1[0].append(3)
+    assert data2 == ([[1], [2]],)
+    assert utils.split_data(nested, 'shared')[1][0] is nested
+
+    parsed = []
+    data1, data2 = utils.split_data(iter([1]), 'reparse',
+                                    lambda: parsed.append(1) or iter([2]))
+    assert (list(data1[0]), list(data2[0]), parsed) == ([1], [2], [1])
+
+
+def test_data_sharing():
+    solution = types.SimpleNamespace()
+    assert utils.data_sharing(solution, (x for x in [])) == 'reparse'
+    assert utils.data_sharing(solution, [1]) == 'copy'
+    solution.DATA_SHARING = 'shared'
+    assert utils.data_sharing(solution, (x for x in [])) == 'shared'
+    solution.DATA_SHARING = 'cow'
+    with pytest.raises(ValueError):
+        utils.data_sharing(solution, [1])
+
+
+def test_lazy_import_threads(tmp_path, monkeypatch):
+    (tmp_path / 'slow_import.py').write_text('import time\ntime.sleep(0.2)\nVALUE = 42\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = utils.lazy_import('slow_import')
+    assert type(module) is utils.LazyModule
+    # every thread touches the module while the first one is still executing it
+    with ThreadPoolExecutor(8) as executor:
+        values = list(executor.map(lambda _: module.VALUE, range(8)))
+    sys.modules.pop('slow_import')
+    assert values == [42] * 8
+    assert type(module) is types.ModuleType
+
+
+def make_solution(mock_solution):
+    mock_solution.parse_input.side_effect = lambda lines: [int(x) for x in lines]
+    mock_solution.part1.side_effect = lambda data: sum(data)
+    mock_solution.part2.side_effect = lambda data: data[-1]
+    return mock_solution
+
+
+@patch('advent_cli.utils.read_input', return_value=['1', '2', '3'])
+@patch('advent_cli.utils.load_solution')
+def test_run_part(mock_load, mock_read):
+    make_solution(mock_load.return_value)
+    assert utils.run_part('2099', '99', 'solution', 1, pickle.dumps(([4, 5],)), 'in') == 9
+    mock_read.assert_not_called()
+    assert utils.run_part('2099', '99', 'solution', 2, None, 'in') == 3
+    mock_read.assert_called_once_with('in')
+
+
+class FakePool:
+    # runs tasks synchronously in-process
+    def __init__(self, processes):
+        self.tasks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def apply_async(self, func, args):
+        self.tasks.append(args)
+        return MagicMock(**{'get.side_effect': lambda timeout: func(*args)})
+
+
+@patch('multiprocessing.Pool', FakePool)
+@patch('advent_cli.utils.read_input', return_value=['1', '2', '3'])
+@patch('advent_cli.utils.load_solution')
+def test_compute_answers_parallel(mock_load, mock_read):
+    make_solution(mock_load.return_value)
+    assert utils.compute_answers_parallel('2099', '99', 'in') == (6, 3)
+
+    # generators can't be pickled, so each part parses again
+    mock_load.return_value.parse_input.side_effect = lambda lines: (int(x) for x in lines)
+    mock_load.return_value.part2.side_effect = lambda data: max(data)
+    assert utils.compute_answers_parallel('2099', '99', 'in') == (6, 3)
+    assert mock_read.call_count == 4
+
+
+@patch('multiprocessing.Pool')
+@patch('advent_cli.utils.read_input', return_value=['1', '2', '3'])
+@patch('advent_cli.utils.load_solution')
+def test_compute_answers_parallel_timeout(mock_load, mock_read, mock_pool):
+    make_solution(mock_load.return_value)
+    mock_pool.return_value.__enter__.return_value.apply_async.return_value.get.side_effect = \
+        multiprocessing.TimeoutError
+    with pytest.raises(utils.PartTimeout) as e:
+        utils.compute_answers_parallel('2099', '99', 'in', timeout=2)
+    assert str(e.value) == 'Part 1 timed out after 2 seconds'
+
+
+@patch('advent_cli.client.post')
 def test_submit_answer_pass(mock_post):
     mock_post.return_value.text = "That's the right answer"
     assert utils.submit_answer('2099', '99', '1', '5') == (utils.Status.PASS, None)
 
 
-@patch('requests.post')
+@patch('advent_cli.client.post')
 def test_submit_answer_fail(mock_post):
     mock_post.return_value.text = "That's not the right answer"
     assert utils.submit_answer('2099', '99', '1', '5') == (utils.Status.FAIL, None)
 
 
-@patch('requests.post')
+@patch('advent_cli.client.post')
 def test_submit_answer_ratelimit(mock_post):
     mock_post.return_value.text = 'You gave an answer too recently'
     assert utils.submit_answer('2099', '99', '1', '5') == (utils.Status.RATE_LIMIT, None)
 
 
-@patch('requests.post')
+@patch('advent_cli.client.post')
 def test_submit_answer_completed(mock_post):
     mock_post.return_value.text = 'Did you already complete it?'
     assert utils.submit_answer('2099', '99', '1', '5') == (utils.Status.COMPLETED, None)
 
 
-@patch('requests.post')
+@patch('advent_cli.client.post')
 def test_submit_answer_unknown_response(mock_post):
     mock_post.return_value.text = 'Error'
     assert utils.submit_answer('2099', '99', '1', '5') == (utils.Status.UNKNOWN, 'Error')
@@ -75,17 +217,21 @@ def test_custom_markdown():
     html = ('<pre><code>this is <em>emphasized</em> text</code></pre>'
             'this is <em>not</em> in a code block')
     with patch.dict(os.environ, {'ADVENT_MARKDOWN_EM': 'default'}):
+        config.reload_config()
         assert utils.custom_markdownify(html) == ('\n```\nthis is *emphasized* text'
                                                   '\n```\nthis is *not* in a code block')
     with patch.dict(os.environ, {'ADVENT_MARKDOWN_EM': 'none'}):
+        config.reload_config()
         assert utils.custom_markdownify(html) == ('\n```\nthis is emphasized text'
                                                   '\n```\nthis is *not* in a code block')
     with patch.dict(os.environ, {'ADVENT_MARKDOWN_EM': 'ib'}):
+        config.reload_config()
         assert utils.custom_markdownify(html) == ('\n<pre><code>this is '
                                                   '<i><b>emphasized</b></i> '
                                                   'text</code></pre>\n'
                                                   'this is *not* in a code block')
     with patch.dict(os.environ, {'ADVENT_MARKDOWN_EM': 'mark'}):
+        config.reload_config()
         assert utils.custom_markdownify(html) == ('\n<pre><code>this is '
                                                   '<mark>emphasized</mark> '
                                                   'text</code></pre>\n'
@@ -0,0 +1,18 @@
+from advent_cli import verify
+from advent_cli.verify import Verdict
+
+
+def test_read_expected(tmp_path, monkeypatch):
+    (tmp_path / '2099' / '01').mkdir(parents=True)
+    (tmp_path / '2099' / '01' / 'solution1.txt').write_text('42\n')
+    monkeypatch.chdir(tmp_path)
+    assert verify.read_expected('2099', '01') == ('42', None)
+
+
+def test_verify_answers():
+    assert verify.verify_answers((42, 'abc'), ('42', 'abc')) == (Verdict.PASS, Verdict.PASS)
+    assert verify.verify_answers((41, None), ('42', None)) == (Verdict.FAIL, Verdict.MISSING)
+    assert verify.verify_answers((41, 7), ('42', '7'), fail_fast=True) == \
+        (Verdict.FAIL, Verdict.SKIPPED)
+    assert verify.passed((Verdict.PASS, Verdict.MISSING))
+    assert not verify.passed((Verdict.PASS, Verdict.FAIL))
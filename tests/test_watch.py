@@ -0,0 +1,51 @@
+import pytest
+import sys
+
+from _fixtures import SOLUTION, make_day
+from advent_cli import watch
+
+
+@pytest.mark.parametrize('make_watcher', [
+    lambda: watch.PollingWatcher(interval=0.01),
+    pytest.param(watch.InotifyWatcher, marks=pytest.mark.skipif(
+        not sys.platform.startswith('linux'), reason='inotify is Linux only'
+    )),
+])
+def test_watcher(make_watcher, tmp_path):
+    watched, ignored = tmp_path / 'solution.py', tmp_path / 'notes.txt'
+    watched.write_text('a')
+    watcher = make_watcher()
+    watcher.watch([str(watched)])
+    ignored.write_text('b')
+    assert watcher.wait(timeout=0.2) == set()
+    watched.write_text('bb')
+    assert watcher.wait(timeout=2) == {str(watched)}
+    watcher.close()
+
+
+def test_worker(make_day):
+    day_dir = make_day('2098')
+    solution, input_file = day_dir / 'solution.py', day_dir / 'input.txt'
+    worker = watch.Worker('2098', '01', str(input_file), 'solution')
+    try:
+        kind, answers, times = worker.run([])
+        assert (kind, answers, len(times)) == ('ok', (6, 3), 3)
+
+        # same size and within the same second, must not run stale bytecode
+        solution.write_text(SOLUTION.replace('max(data)', 'min(data)'))
+        assert worker.run([str(solution)])[:2] == ('ok', (6, 1))
+
+        solution.write_text(SOLUTION.replace('return sum(data)', 'return sum(data) +'))
+        kind, error, _ = worker.run([str(solution)])
+        assert kind == 'error' and 'SyntaxError' in error
+
+        solution.write_text(SOLUTION.replace('return sum(data)', 'import os; os._exit(3)'))
+        assert worker.run([str(solution)]) == ('crashed', 3, None)
+
+        solution.write_text(SOLUTION.replace('return sum(data)', 'while True: pass'))
+        assert worker.run([str(solution)], timeout=0.5) == ('timeout', None, None)
+
+        solution.write_text(SOLUTION)
+        assert worker.run([str(solution)])[:2] == ('ok', (6, 3))
+    finally:
+        worker.stop()